@@ -0,0 +1,303 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import password_engine
+import password_strength
+import rps_engine
+from mnk_engine import VARIANTS, MNKBoard, Searcher
+from tic_tac_toe_engine import Board
+from tic_tac_toe_solver import get_solver
+
+# Headless micro-benchmarks for the hot paths of all three apps. Every case
+# reports operations per second; compare a run against a saved baseline with
+#   python benchmarks.py --out new.json --baseline old.json
+DEFAULT_THRESHOLD = 0.10
+MIN_TIME = 0.2
+REPEAT = 3
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    # Register a setup function returning (run(), operations per run)
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def random_positions(count, rows=3, cols=3, k=3, seed=1, mnk=False):
+    # Non-terminal positions reached by random play, on the engine the GUI would use
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = Board() if (rows, cols, k) == (3, 3, 3) and not mnk else MNKBoard(rows, cols, k)
+        for _ in range(rng.randrange(rows * cols // 2)):
+            board.make_move(*rng.choice(board.empty_cells()))
+            if board.winner:
+                break
+        if not board.winner and not board.is_draw():
+            positions.append(board)
+    return positions
+
+
+# ---------- Tic Tac Toe ----------
+for _variant, (_rows, _cols, _k) in VARIANTS.items():
+    @benchmark(f"tictactoe.check_winner[{_variant}]")
+    def _(rows=_rows, cols=_cols, k=_k):
+        boards = random_positions(64, rows, cols, k)
+
+        def run():
+            for board in boards:
+                board.check_winner("X")
+                board.check_winner("O")
+        return run, len(boards) * 2
+
+    @benchmark(f"tictactoe.is_draw[{_variant}]")
+    def _(rows=_rows, cols=_cols, k=_k):
+        boards = random_positions(64, rows, cols, k)
+
+        def run():
+            for board in boards:
+                board.is_draw()
+        return run, len(boards)
+
+    @benchmark(f"tictactoe.make_undo[{_variant}]")
+    def _(rows=_rows, cols=_cols, k=_k):
+        boards = random_positions(64, rows, cols, k)
+        moves = [board.empty_cells()[0] for board in boards]
+
+        def run():
+            for board, (row, col) in zip(boards, moves):
+                board.make_move(row, col)
+                board.undo_move()
+        return run, len(boards)
+
+
+@benchmark("tictactoe.ai_move[3x3 solver]")
+def _():
+    solver = get_solver()
+    boards = random_positions(64)
+    rng = random.Random(2)
+
+    def run():
+        for board in boards:
+            solver.best_move(board, rng=rng)
+    return run, len(boards)
+
+
+for _variant, (_rows, _cols, _k) in VARIANTS.items():
+    # Fixed-depth search so the work per move does not depend on the clock
+    @benchmark(f"tictactoe.ai_move[{_variant} depth 2]")
+    def _(rows=_rows, cols=_cols, k=_k):
+        boards = random_positions(4, rows, cols, k, mnk=True)
+
+        def run():
+            for board in boards:
+                Searcher(time_budget=60, max_depth=2).best_move(board)
+        return run, len(boards)
+
+
+for _size in (1_000, 100_000):
+    @benchmark(f"tictactoe.batch_evaluate[{_size}]")
+    def _(size=_size):
+        import tic_tac_toe_batch
+        if tic_tac_toe_batch.np is None:
+            return None
+        np = tic_tac_toe_batch.np
+        cells = np.random.default_rng(3).choice(np.array([0, 1, -1], dtype=np.int8), size=(size, 9))
+
+        def run():
+            tic_tac_toe_batch.evaluate(cells)
+        return run, size
+
+
+# ---------- Password generator ----------
+for _length in (8, 16, 32, 64):
+    @benchmark(f"password.generate_password[{_length}]")
+    def _(length=_length):
+        def run():
+            for _ in range(100):
+                password_engine.generate_password(length, True, True, True, True, True)
+        return run, 100
+
+    @benchmark(f"password.update_strength[{_length}]")
+    def _(length=_length):
+        passwords = [password_engine.generate_password(length, True, True, True, True)
+                     for _ in range(100)]
+
+        def run():
+            for password in passwords:
+                password_strength.score_password(password)
+        return run, len(passwords)
+
+
+for _size in (1_000, 100_000):
+    @benchmark(f"password.score_batch[{_size}]")
+    def _(size=_size):
+        passwords = list(password_engine.iter_passwords(size, 16, use_symbols=True))
+
+        def run():
+            password_strength.score_batch(passwords)
+        return run, size
+
+
+# ---------- Rock Paper Scissors ----------
+for _size in (100, 10_000):
+    @benchmark(f"rps.determine_winner[{_size}]")
+    def _(size=_size):
+        rng = random.Random(4)
+        rounds = [(rng.choice(rps_engine.OPTIONS), rng.choice(rps_engine.OPTIONS)) for _ in range(size)]
+
+        def run():
+            for user_choice, comp_choice in rounds:
+                rps_engine.round_outcome(user_choice, comp_choice)
+        return run, size
+
+
+@benchmark("rps.simulate[random vs wsls, 1M rounds]")
+def _():
+    import rps_simulation
+    if rps_simulation.np is None:
+        return None
+
+    def run():
+        rps_simulation.simulate("random", "wsls", games=10_000, rounds=100)
+    return run, 1_000_000
+
+
+# ---------- Startup ----------
+# Cold starts in a fresh interpreter (its own start-up included), so these
+# catch modules that begin importing NumPy, tkinter or a process pool eagerly
+HERE = os.path.dirname(os.path.abspath(__file__))
+ENGINE_MODULES = ("password_engine", "password_strength", "passphrase", "rps_engine",
+                  "mnk_engine", "tic_tac_toe_solver", "tablebase")
+GUI_MODULES = ("password_generator_advanced", "rps_gui", "tic_tac_toe_ai")
+# Runs an app's main() up to its first drawn window, then closes it
+GUI_PROBE = ("import tkinter\n"
+             "tkinter.Misc.mainloop = lambda self, n=0: (self.update(), self.destroy())\n"
+             "import {0}\n"
+             "{0}.main()\n")
+
+
+def _cold_start(code):
+    command = [sys.executable, "-c", code]
+
+    def run():
+        subprocess.run(command, cwd=HERE, check=True, stdout=subprocess.DEVNULL)
+    return run, 1
+
+
+@benchmark("startup.python")
+def _():
+    return _cold_start("pass")
+
+
+for _module in ENGINE_MODULES + GUI_MODULES:
+    @benchmark(f"startup.import[{_module}]")
+    def _(module=_module):
+        return _cold_start(f"import {module}")
+
+
+for _module in GUI_MODULES:
+    @benchmark(f"startup.window[{_module}]")
+    def _(module=_module):
+        import tkinter
+        try:
+            tkinter.Tk().destroy()
+        except tkinter.TclError:  # no display
+            return None
+        return _cold_start(GUI_PROBE.format(module))
+
+
+def measure(run, ops, min_time=MIN_TIME, repeat=REPEAT):
+    # Best of `repeat` timings, each looping run() for at least min_time
+    run()
+    best = float("inf")
+    for _ in range(repeat):
+        loops = 0
+        start = time.perf_counter()
+        while True:
+            run()
+            loops += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / (loops * ops))
+    return best
+
+
+def run_benchmarks(select=None, min_time=MIN_TIME, repeat=REPEAT):
+    results = {}
+    for name, setup in BENCHMARKS:
+        if select and not any(s in name for s in select):
+            continue
+        case = setup()
+        if case is None:
+            print(f"{name:45s} skipped")
+            continue
+        run, ops = case
+        seconds = measure(run, ops, min_time, repeat)
+        results[name] = {"ops_per_sec": 1 / seconds, "seconds_per_op": seconds}
+        print(f"{name:45s} {1 / seconds:>14,.0f} ops/s")
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    # Names of cases whose throughput dropped by more than threshold
+    regressions = []
+    print(f"\n{'benchmark':45s} {'baseline':>14s} {'current':>14s} {'change':>8s}")
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        old = baseline["results"][name]["ops_per_sec"]
+        new = result["ops_per_sec"]
+        change = new / old - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:45s} {old:>14,.0f} {new:>14,.0f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the game and password engines")
+    parser.add_argument("-k", dest="select", action="append",
+                        help="only run benchmarks whose name contains this text (repeatable)")
+    parser.add_argument("--out", metavar="PATH", help="write results to PATH as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a previous JSON run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="flag throughput drops larger than this fraction (default 0.10)")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.select, args.min_time, args.repeat)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import os
+import sys
+from collections import Counter
+
+from tic_tac_toe_engine import CELL_BITS, cell_coords, cell_index
+
+# Finished 3x3 games, appended to one file. After the file header every record is
+#   1 header byte: move count (bits 0-3), result (bits 4-5: 0 draw, 1 X, 2 O),
+#                  mode (bits 6-7: which sides a computer played, see MODES)
+#   ceil(moves / 2) bytes: cell indices 0..8, two per byte, low nibble first
+GAME_RECORD_FILE = "tic_tac_toe_games.bin"
+FILE_MAGIC = b"TTTG\x01"
+RESULTS = ("D", "X", "O")
+# Indexed by (O is a computer) | (X is a computer) << 1; the desktop app's AI plays O
+MODES = ("PvP", "PvAI", "AIvP", "AIvAI")
+AI_SIDES = {"PvP": "", "PvAI": "O", "AIvP": "X", "AIvAI": "XO"}
+READ_SIZE = 1 << 20
+
+
+def game_mode(x_is_ai, o_is_ai):
+    return MODES[bool(o_is_ai) | bool(x_is_ai) << 1]
+
+
+def pack_game(moves, result, mode="PvP"):
+    # moves are (row, col) tuples as kept in the engine history
+    cells = [cell_index(row, col) for row, col in moves]
+    if len(cells) > 9:
+        raise ValueError("A 3x3 game has at most 9 moves")
+    header = len(cells) | RESULTS.index(result) << 4 | MODES.index(mode) << 6
+    packed = bytearray([header])
+    for i in range(0, len(cells), 2):
+        low = cells[i]
+        high = cells[i + 1] if i + 1 < len(cells) else 0
+        packed.append(low | high << 4)
+    return bytes(packed)
+
+
+class GameRecordWriter:
+    def __init__(self, path=GAME_RECORD_FILE):
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(FILE_MAGIC)
+
+    def append(self, moves, result, mode="PvP"):
+        self.file.write(pack_game(moves, result, mode))
+
+    def append_packed(self, data):
+        self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def iter_records(path=GAME_RECORD_FILE):
+    # Yields (cells, result, mode) one game at a time, reading the file in blocks;
+    # a partly written record at the end of the file is ignored
+    with open(path, "rb") as f:
+        if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+            raise ValueError(f"{path} is not a game record file")
+        buffer = b""
+        while True:
+            block = f.read(READ_SIZE)
+            if not block:
+                break
+            buffer += block
+            pos = 0
+            end = len(buffer)
+            while pos < end:
+                header = buffer[pos]
+                count = header & 0x0F
+                size = 1 + (count + 1) // 2
+                if pos + size > end:
+                    break
+                cells = []
+                for byte in buffer[pos + 1:pos + size]:
+                    cells.append(byte & 0x0F)
+                    cells.append(byte >> 4)
+                yield tuple(cells[:count]), RESULTS[header >> 4 & 3], MODES[header >> 6 & 3]
+                pos += size
+            buffer = buffer[pos:]
+
+
+def replay(cells):
+    # (x, o) bitboards after each move of a record
+    x = o = 0
+    positions = []
+    for ply, cell in enumerate(cells):
+        if ply % 2 == 0:
+            x |= CELL_BITS[cell]
+        else:
+            o |= CELL_BITS[cell]
+        positions.append((x, o))
+    return positions
+
+
+def analyze(path=GAME_RECORD_FILE, solver=None):
+    if solver is None:
+        from tic_tac_toe_solver import get_solver
+        solver = get_solver()
+
+    # Game-theoretic outcome from X's side (+1, 0, -1), cached per position
+    outcomes = {}
+
+    def outcome(x, o):
+        key = x | o << 9
+        if key not in outcomes:
+            value = solver.value(x, o)
+            x_to_move = bin(x).count("1") == bin(o).count("1")
+            sign = (value > 0) - (value < 0)
+            outcomes[key] = sign if x_to_move else -sign
+        return outcomes[key]
+
+    games = 0
+    results = Counter()
+    openings = Counter()
+    replies = Counter()
+    decided_at = Counter()
+    moves = {"X": 0, "O": 0, "AI": 0}
+    blunders = {"X": 0, "O": 0, "AI": 0}
+    for cells, result, mode in iter_records(path):
+        games += 1
+        results[result] += 1
+        if cells:
+            openings[cell_coords(cells[0])] += 1
+        if len(cells) > 1:
+            replies[(cell_coords(cells[0]), cell_coords(cells[1]))] += 1
+
+        values = [outcome(0, 0)] + [outcome(x, o) for x, o in replay(cells)]
+        # The result was decided by the move after which the theoretical outcome
+        # stopped changing; 0 means it was never in doubt
+        decided = 0
+        for ply in range(len(values) - 1, 0, -1):
+            if values[ply - 1] != values[ply]:
+                decided = ply
+                break
+        decided_at[decided] += 1
+
+        for ply in range(len(cells)):
+            side = "X" if ply % 2 == 0 else "O"
+            sign = 1 if side == "X" else -1
+            blunder = values[ply + 1] * sign < values[ply] * sign
+            moves[side] += 1
+            blunders[side] += blunder
+            if side in AI_SIDES[mode]:
+                moves["AI"] += 1
+                blunders["AI"] += blunder
+
+    return {
+        "games": games,
+        "results": dict(results),
+        "openings": openings.most_common(),
+        "replies": replies.most_common(10),
+        "decided_at": dict(sorted(decided_at.items())),
+        "blunder_rate": {side: blunders[side] / moves[side] if moves[side] else 0.0 for side in moves},
+    }
+
+
+def print_analysis(report):
+    games = report["games"] or 1
+    print(f"{report['games']} games: " + "  ".join(
+        f"{name} {report['results'].get(key, 0) / games:.2%}"
+        for key, name in (("X", "X wins"), ("O", "O wins"), ("D", "draws"))))
+    print("Opening moves:")
+    for (row, col), count in report["openings"]:
+        print(f"  ({row}, {col}) {count / games:.2%}")
+    print("Most common first replies:")
+    for ((r1, c1), (r2, c2)), count in report["replies"]:
+        print(f"  ({r1}, {c1}) -> ({r2}, {c2}) {count / games:.2%}")
+    print("Move that decided the result (0 = never in doubt):")
+    for ply, count in report["decided_at"].items():
+        print(f"  {ply}: {count / games:.2%}")
+    rates = report["blunder_rate"]
+    print(f"Blunder rate: X {rates['X']:.2%}  O {rates['O']:.2%}  AI {rates['AI']:.2%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise a Tic Tac Toe game record file")
+    parser.add_argument("path", nargs="?", default=GAME_RECORD_FILE)
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.path):
+        sys.exit(f"{args.path} does not exist")
+    print_analysis(analyze(args.path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import rps_engine
+from latency import LatencyHistogram
+from mnk_engine import VARIANTS, Searcher, new_board
+from tablebase import get_tablebase
+from tic_tac_toe_engine import Board
+from tic_tac_toe_solver import DIFFICULTIES, get_solver
+
+# Line-delimited JSON over TCP. Requests (client -> server):
+#   {"op": "new", "game": "ttt" | "rps", "opponent": "ai" | "human",
+#    "variant": "3x3", "side": "X" | "O", "difficulty": "Hard"}
+#   {"op": "move", "session": ID, "cell": [ROW, COL]}      Tic Tac Toe
+#   {"op": "move", "session": ID, "choice": "Rock"}         Rock Paper Scissors
+#   {"op": "leave", "session": ID}
+#   {"op": "ping"}
+# Events (server -> client): waiting, started, moved, round, left, evicted,
+# pong and error, each with the session id where there is one. The move that
+# ends a Tic Tac Toe game carries "result": "X", "O" or "draw".
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+IDLE_TIMEOUT = 300.0
+EVICT_INTERVAL = 5.0
+# Seconds close() waits for connection handlers to finish before cancelling them
+SHUTDOWN_TIMEOUT = 1.0
+MAX_LINE = 4096
+# Live search for boards other than 3x3 runs on these threads, briefly
+AI_TIME_BUDGET = 0.1
+AI_WORKERS = 4
+AI_TT_LIMIT = 1 << 16
+
+
+def _encode(msg):
+    return json.dumps(msg, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class Client:
+    __slots__ = ("writer", "name", "sessions")
+
+    def __init__(self, writer, name="Player"):
+        self.writer = writer
+        self.name = name
+        self.sessions = set()
+
+    def send(self, **msg):
+        if not self.writer.is_closing():
+            self.writer.write(_encode(msg))
+
+
+class TicTacToeSession:
+    # players maps "X"/"O" to a Client, or to None for the AI
+    __slots__ = ("id", "variant", "board", "players", "blunder", "last_active")
+
+    def __init__(self, session_id, variant, players, blunder):
+        self.id = session_id
+        self.variant = variant
+        self.board = new_board(*VARIANTS[variant])
+        self.players = players
+        self.blunder = blunder
+        self.last_active = time.monotonic()
+
+    def clients(self):
+        return [c for c in self.players.values() if c is not None]
+
+
+class RPSSession:
+    # players is a pair of Clients; the second is None against the AI
+    __slots__ = ("id", "players", "opponent", "choices", "scores", "last_active")
+
+    def __init__(self, session_id, players, difficulty):
+        self.id = session_id
+        self.players = players
+        self.opponent = rps_engine.AdaptiveOpponent(difficulty) if players[1] is None else None
+        self.choices = [None, None]
+        self.scores = [0, 0]
+        self.last_active = time.monotonic()
+
+    def clients(self):
+        return [c for c in self.players if c is not None]
+
+
+class GameServer:
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, seed=None):
+        self.sessions = {}
+        self.clients = set()
+        self.tasks = set()  # one handle() task per connection
+        self.ids = itertools.count(1)
+        self.queues = {}  # (game, variant) -> deque of waiting (client, request)
+        self.idle_timeout = idle_timeout
+        self.rng = random.Random(seed)
+        self.executor = ThreadPoolExecutor(AI_WORKERS, thread_name_prefix="game ai")
+        self.handlers = {"new": self.op_new, "move": self.op_move, "leave": self.op_leave,
+                         "ping": self.op_ping}
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        self.evictor = asyncio.create_task(self.evict_loop())
+        return self.server
+
+    async def close(self):
+        self.evictor.cancel()
+        self.server.close()
+        # Closing the transports ends each handle() loop at its next read; the
+        # tasks are awaited so none is left for the loop to cancel at exit, which
+        # logs a CancelledError traceback per connection. Cancelling is the
+        # fallback for a handler still stuck after SHUTDOWN_TIMEOUT.
+        for client in list(self.clients):
+            client.writer.close()
+        if self.tasks:
+            _, stuck = await asyncio.wait(list(self.tasks), timeout=SHUTDOWN_TIMEOUT)
+            for task in stuck:
+                task.cancel()
+        await self.server.wait_closed()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def handle(self, reader, writer):
+        client = Client(writer)
+        self.clients.add(client)
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):  # line too long, or reset
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    handler = self.handlers[request["op"]]
+                except (ValueError, KeyError, TypeError):
+                    client.send(event="error", message="Bad request")
+                    continue
+                try:
+                    await handler(client, request)
+                except (KeyError, ValueError, TypeError, IndexError) as e:
+                    client.send(event="error", session=request.get("session"), message=str(e) or "Bad request")
+                await writer.drain()
+        finally:
+            self.tasks.discard(task)
+            self.clients.discard(client)
+            self.disconnect(client)
+            writer.close()
+
+    def disconnect(self, client):
+        for queue in self.queues.values():
+            for entry in [e for e in queue if e[0] is client]:
+                queue.remove(entry)
+        for session_id in list(client.sessions):
+            self.end_session(self.sessions[session_id], "left", client)
+
+    def end_session(self, session, event=None, leaver=None):
+        # Drops the session and tells everyone still connected (except the leaver)
+        self.sessions.pop(session.id, None)
+        for c in session.clients():
+            c.sessions.discard(session.id)
+            if event and c is not leaver:
+                c.send(event=event, session=session.id)
+
+    def get_session(self, client, request):
+        session = self.sessions.get(request.get("session"))
+        if session is None or client not in session.clients():
+            raise KeyError("No such session")
+        session.last_active = time.monotonic()
+        return session
+
+    async def evict_loop(self):
+        while True:
+            await asyncio.sleep(min(EVICT_INTERVAL, self.idle_timeout))
+            cutoff = time.monotonic() - self.idle_timeout
+            for session in [s for s in self.sessions.values() if s.last_active < cutoff]:
+                self.end_session(session, "evicted")
+
+    # ---------- Requests ----------
+    async def op_ping(self, client, request):
+        client.send(event="pong")
+
+    async def op_new(self, client, request):
+        game = request.get("game", "ttt")
+        if game not in ("ttt", "rps"):
+            raise ValueError(f"Unknown game: {game}")
+        variant = request.get("variant", "3x3") if game == "ttt" else ""
+        if game == "ttt" and variant not in VARIANTS:
+            raise ValueError(f"Unknown variant: {variant}")
+        client.name = str(request.get("name", client.name))[:40]
+        if request.get("opponent", "ai") == "ai":
+            await self.start_ai_game(client, game, variant, request)
+            return
+        queue = self.queues.setdefault((game, variant), deque())
+        while queue:
+            other, other_request = queue.popleft()
+            if not other.writer.is_closing() and other is not client:
+                self.start_human_game(game, variant, other, client)
+                return
+        queue.append((client, request))
+        client.send(event="waiting", game=game, variant=variant)
+
+    async def start_ai_game(self, client, game, variant, request):
+        difficulty = request.get("difficulty", "Hard")
+        if game == "rps":
+            session = RPSSession(next(self.ids), (client, None), difficulty)
+            self.add_session(session)
+            client.send(event="started", session=session.id, game="rps", opponent="AI")
+            return
+        side = request.get("side", "X")
+        if side not in ("X", "O"):
+            raise ValueError("side must be X or O")
+        ai_side = "O" if side == "X" else "X"
+        session = TicTacToeSession(next(self.ids), variant, {side: client, ai_side: None},
+                                   DIFFICULTIES[difficulty])
+        self.add_session(session)
+        self.send_started(session)
+        if ai_side == "X":
+            await self.play_ai(session)
+
+    def start_human_game(self, game, variant, first, second):
+        if game == "rps":
+            session = RPSSession(next(self.ids), (first, second), "Hard")
+            self.add_session(session)
+            first.send(event="started", session=session.id, game="rps", opponent=second.name)
+            second.send(event="started", session=session.id, game="rps", opponent=first.name)
+        else:
+            session = TicTacToeSession(next(self.ids), variant, {"X": first, "O": second}, 0.0)
+            self.add_session(session)
+            self.send_started(session)
+
+    def add_session(self, session):
+        self.sessions[session.id] = session
+        for c in session.clients():
+            c.sessions.add(session.id)
+
+    def send_started(self, session):
+        rows, cols, k = VARIANTS[session.variant]
+        for side, c in session.players.items():
+            if c is not None:
+                other = session.players["O" if side == "X" else "X"]
+                c.send(event="started", session=session.id, game="ttt", variant=session.variant,
+                       rows=rows, cols=cols, k=k, you=side, opponent=other.name if other else "AI")
+
+    async def op_leave(self, client, request):
+        session = self.get_session(client, request)
+        self.end_session(session, "left", client)
+
+    async def op_move(self, client, request):
+        session = self.get_session(client, request)
+        if isinstance(session, RPSSession):
+            self.rps_move(session, client, request["choice"])
+            return
+        board = session.board
+        side = board.current_player
+        if session.players[side] is not client:
+            raise ValueError("Not your turn")
+        row, col = (int(v) for v in request["cell"])
+        rows, cols, _ = VARIANTS[session.variant]
+        if not (0 <= row < rows and 0 <= col < cols) or not board.make_move(row, col):
+            raise ValueError("Illegal move")
+        if self.after_move(session, side, row, col) and session.players[board.current_player] is None:
+            await self.play_ai(session)
+
+    # ---------- Tic Tac Toe ----------
+    def after_move(self, session, side, row, col):
+        # Broadcasts the move; False once the game is over
+        board = session.board
+        result = side if board.check_winner(side) else "draw" if board.is_draw() else None
+        msg = dict(event="moved", session=session.id, player=side, cell=[row, col], next=board.current_player)
+        if result:
+            msg["result"] = result
+        for c in session.clients():
+            c.send(**msg)
+        if result:
+            self.end_session(session)
+            return False
+        return True
+
+    async def play_ai(self, session):
+        # Same move choice as the desktop app: the solver table on 3x3, a built
+        # tablebase where there is one, else a short iterative-deepening search
+        # (off the event loop) on the larger boards
+        board = session.board
+        table = None if isinstance(board, Board) else get_tablebase(board.rows, board.cols, board.k)
+        move = None
+        if isinstance(board, Board):
+            move = get_solver().best_move(board, session.blunder, self.rng)
+        elif session.blunder and self.rng.random() < session.blunder:
+            move = self.rng.choice(board.empty_cells())
+        elif table is not None:
+            move = table.best_move(board, self.rng)
+        if move is None:
+            searcher = Searcher(AI_TIME_BUDGET, tt_limit=AI_TT_LIMIT)
+            try:
+                move = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, searcher.best_move, board.copy())
+            except RuntimeError:  # shutting down
+                return
+            if session.id not in self.sessions:  # the player left meanwhile
+                return
+        side = board.current_player
+        board.make_move(*move)
+        self.after_move(session, side, *move)
+
+    # ---------- Rock Paper Scissors ----------
+    def rps_move(self, session, client, choice):
+        if choice not in rps_engine.OPTIONS:
+            raise ValueError(f"Unknown choice: {choice}")
+        seat = session.players.index(client)
+        if session.choices[seat] is not None:
+            raise ValueError("Already chose this round")
+        session.choices[seat] = choice
+        if session.opponent is not None:
+            session.choices[1] = session.opponent.choose()
+            session.opponent.observe(choice, session.choices[1])
+        if None in session.choices:
+            return
+        outcome = rps_engine.round_outcome(*session.choices)
+        if outcome == "win":
+            session.scores[0] += 1
+        elif outcome == "lose":
+            session.scores[1] += 1
+        mirrored = {"win": "lose", "lose": "win", "tie": "tie"}
+        for seat, c in enumerate(session.players):
+            if c is not None:
+                c.send(event="round", session=session.id, you=session.choices[seat],
+                       opponent=session.choices[1 - seat],
+                       outcome=outcome if seat == 0 else mirrored[outcome],
+                       score=[session.scores[seat], session.scores[1 - seat]])
+        session.choices = [None, None]
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, idle_timeout=IDLE_TIMEOUT):
+    server = GameServer(idle_timeout)
+    listener = await server.start(host, port)
+    print(f"Serving on {', '.join(str(s.getsockname()) for s in listener.sockets)}", file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+
+# ---------- Load generator ----------
+RPS_ROUNDS = 20
+
+
+async def _read_event(reader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Server closed the connection")
+    return json.loads(line)
+
+
+async def _play_ttt(reader, writer, variant, rng, latencies):
+    writer.write(_encode({"op": "new", "game": "ttt", "variant": variant, "opponent": "ai"}))
+    started = await _read_event(reader)
+    if started["event"] != "started":
+        raise ConnectionError(f"Unexpected reply: {started}")
+    session = started["session"]
+    empty = {(r, c) for r in range(started["rows"]) for c in range(started["cols"])}
+    moves = 0
+    while True:
+        row, col = rng.choice(sorted(empty))
+        sent = time.perf_counter()
+        writer.write(_encode({"op": "move", "session": session, "cell": [row, col]}))
+        # Our move echoed back, then the AI's reply; either may end the game
+        while True:
+            event = await _read_event(reader)
+            if event["event"] != "moved":
+                raise ConnectionError(f"Unexpected reply: {event}")
+            empty.discard(tuple(event["cell"]))
+            if "result" in event or event["player"] != started["you"]:
+                break
+        latencies.add(time.perf_counter() - sent)
+        moves += 1
+        if "result" in event:
+            return moves
+
+
+async def _play_rps(reader, writer, rng, latencies):
+    writer.write(_encode({"op": "new", "game": "rps", "opponent": "ai"}))
+    started = await _read_event(reader)
+    session = started["session"]
+    for _ in range(RPS_ROUNDS):
+        sent = time.perf_counter()
+        writer.write(_encode({"op": "move", "session": session, "choice": rng.choice(rps_engine.OPTIONS)}))
+        event = await _read_event(reader)
+        if event["event"] != "round":
+            raise ConnectionError(f"Unexpected reply: {event}")
+        latencies.add(time.perf_counter() - sent)
+    writer.write(_encode({"op": "leave", "session": session}))
+    return RPS_ROUNDS
+
+
+async def _load_client(host, port, game, variant, sessions, seed, latencies, totals):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+    try:
+        for _ in range(sessions):
+            if game == "ttt":
+                moves = await _play_ttt(reader, writer, variant, rng, latencies)
+            else:
+                moves = await _play_rps(reader, writer, rng, latencies)
+            totals["moves"] += moves
+            totals["sessions"] += 1
+    except (ConnectionError, json.JSONDecodeError):
+        totals["errors"] += 1
+    finally:
+        writer.close()
+
+
+async def loadgen(host=DEFAULT_HOST, port=DEFAULT_PORT, clients=100, sessions=10, game="ttt",
+                  variant="3x3", seed=0, in_process=False):
+    # clients connections, each playing `sessions` games against the AI in turn
+    server = None
+    if in_process:
+        server = GameServer(seed=seed)
+        listener = await server.start(host, 0)
+        port = listener.sockets[0].getsockname()[1]
+    latencies = LatencyHistogram()
+    totals = {"sessions": 0, "moves": 0, "errors": 0}
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(_load_client(host, port, game, variant, sessions, seed * 100_003 + i,
+                                            latencies, totals) for i in range(clients)))
+    finally:
+        seconds = time.perf_counter() - start
+        if server is not None:
+            await server.close()
+    return {
+        "game": game,
+        "variant": variant if game == "ttt" else "",
+        "clients": clients,
+        "sessions": totals["sessions"],
+        "moves": totals["moves"],
+        "errors": totals["errors"],
+        "seconds": seconds,
+        "sessions_per_second": totals["sessions"] / seconds if seconds else 0.0,
+        "moves_per_second": totals["moves"] / seconds if seconds else 0.0,
+        "move_latency": latencies.summary(),
+    }
+
+
+def print_report(report):
+    name = f"{report['game']} {report['variant']}".strip()
+    print(f"{name}: {report['sessions']:,} sessions, {report['moves']:,} moves on {report['clients']} "
+          f"connections in {report['seconds']:.2f}s ({report['errors']} errors)")
+    print(f"{report['sessions_per_second']:,.0f} sessions/s, {report['moves_per_second']:,.0f} moves/s")
+    lat = report["move_latency"]
+    print(f"move latency ms: p50 {lat['p50_ms']:.3f}  p90 {lat['p90_ms']:.3f}  p99 {lat['p99_ms']:.3f}  "
+          f"p99.9 {lat['p99.9_ms']:.3f}  max {lat['max_ms']:.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multiplayer Tic Tac Toe / Rock Paper Scissors server")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_cmd = commands.add_parser("serve", help="run the server")
+    serve_cmd.add_argument("--host", default=DEFAULT_HOST)
+    serve_cmd.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_cmd.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                           help="seconds before an untouched session is dropped")
+    load_cmd = commands.add_parser("loadgen", help="play many AI sessions against a server")
+    load_cmd.add_argument("--host", default=DEFAULT_HOST)
+    load_cmd.add_argument("--port", type=int, default=DEFAULT_PORT)
+    load_cmd.add_argument("--clients", type=int, default=100, help="concurrent connections")
+    load_cmd.add_argument("--sessions", type=int, default=10, help="sessions per connection")
+    load_cmd.add_argument("--game", choices=("ttt", "rps"), default="ttt")
+    load_cmd.add_argument("--variant", choices=list(VARIANTS), default="3x3")
+    load_cmd.add_argument("--seed", type=int, default=0)
+    load_cmd.add_argument("--in-process", action="store_true",
+                          help="start a server in this process on a free loopback port")
+    load_cmd.add_argument("--json", metavar="PATH", help="also write the report to PATH as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "serve":
+            asyncio.run(serve(args.host, args.port, args.idle_timeout))
+            return
+        report = asyncio.run(loadgen(args.host, args.port, args.clients, args.sessions, args.game,
+                                     args.variant, args.seed, args.in_process))
+    except KeyboardInterrupt:
+        return
+    except OSError as e:
+        sys.exit(str(e))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import math
+
+
+class LatencyHistogram:
+    # Log-spaced buckets (20 per decade from 100 ns up to 100 s), so memory stays
+    # fixed no matter how many samples are recorded and histograms merge by addition
+    MIN_VALUE = 1e-7
+    PER_DECADE = 20
+    DECADES = 9
+
+    def __init__(self):
+        self.counts = [0] * (self.PER_DECADE * self.DECADES + 2)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def bucket(self, seconds):
+        if seconds <= self.MIN_VALUE:
+            return 0
+        index = int(math.log10(seconds / self.MIN_VALUE) * self.PER_DECADE) + 1
+        return min(index, len(self.counts) - 1)
+
+    def bucket_upper(self, index):
+        return self.MIN_VALUE * 10 ** (index / self.PER_DECADE)
+
+    def add(self, seconds):
+        self.counts[self.bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    def clear(self):
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def percentile(self, p):
+        # Upper edge of the bucket holding the p-th percentile sample
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= target:
+                return min(self.bucket_upper(i), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self, percentiles=(50, 90, 99, 99.9)):
+        # Milliseconds, ready for printing or dumping to JSON
+        result = {"count": self.count, "mean_ms": self.mean() * 1000, "max_ms": self.max * 1000}
+        for p in percentiles:
+            result[f"p{p:g}_ms"] = self.percentile(p) * 1000
+        return result
@@ -0,0 +1,336 @@
+import random
+import time
+
+from tic_tac_toe_engine import Board
+
+# Board variants offered in the GUI: rows, columns and stones in a row needed to win
+VARIANTS = {
+    "3x3": (3, 3, 3),
+    "4x4": (4, 4, 4),
+    "5x5 (4 in a row)": (5, 5, 4),
+    "15x15 Gomoku": (15, 15, 5),
+}
+
+EMPTY, X, O = 0, 1, 2
+SYMBOLS = ("", "X", "O")
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Score of a window holding n stones of one side and none of the other
+WINDOW_WEIGHTS = tuple(8 ** n - 1 for n in range(16))
+WIN_SCORE = 1 << 40
+MATE_BOUND = WIN_SCORE - 10_000
+
+_geometry_cache = {}
+_zobrist_cache = {}
+
+
+def _geometry(rows, cols, k):
+    # Every length-k window on the board, and the windows passing through each cell
+    key = (rows, cols, k)
+    if key not in _geometry_cache:
+        lines = []
+        for r in range(rows):
+            for c in range(cols):
+                for dr, dc in DIRECTIONS:
+                    end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                    if 0 <= end_r < rows and 0 <= end_c < cols:
+                        lines.append(tuple((r + dr * i) * cols + c + dc * i for i in range(k)))
+        cell_lines = [[] for _ in range(rows * cols)]
+        for line_id, line in enumerate(lines):
+            for cell in line:
+                cell_lines[cell].append(line_id)
+        _geometry_cache[key] = (tuple(lines), tuple(tuple(ids) for ids in cell_lines))
+    return _geometry_cache[key]
+
+
+def _zobrist(size):
+    # One random 64-bit key per (cell, side); seeded so hashes are stable between runs
+    if size not in _zobrist_cache:
+        rng = random.Random(size)
+        _zobrist_cache[size] = (
+            tuple((0, rng.getrandbits(64), rng.getrandbits(64)) for _ in range(size)),
+            rng.getrandbits(64),
+        )
+    return _zobrist_cache[size]
+
+
+class MNKBoard:
+    def __init__(self, rows=3, cols=3, k=3):
+        if k > max(rows, cols):
+            raise ValueError(f"{k} in a row does not fit on a {rows}x{cols} board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self.lines, self.cell_lines = _geometry(rows, cols, k)
+        self.zobrist, self.zobrist_side = _zobrist(self.size)
+        self.reset()
+
+    def reset(self):
+        self.cells = [EMPTY] * self.size
+        # counts[side][line] is the number of that side's stones in the window
+        self.counts = (None, [0] * len(self.lines), [0] * len(self.lines))
+        self.side = X
+        self.winner = EMPTY
+        self.moves = 0
+        self.hash = 0
+        self.score = 0  # static evaluation from X's point of view
+        self.history = []
+
+    def copy(self):
+        board = MNKBoard.__new__(MNKBoard)
+        board.__dict__.update(self.__dict__)
+        board.cells = list(self.cells)
+        board.counts = (None, list(self.counts[X]), list(self.counts[O]))
+        board.history = list(self.history)
+        return board
+
+    @property
+    def current_player(self):
+        return SYMBOLS[self.side]
+
+    def cell(self, row, col):
+        return SYMBOLS[self.cells[row * self.cols + col]]
+
+    def empty_cells(self):
+        return [divmod(i, self.cols) for i in range(self.size) if not self.cells[i]]
+
+    def play(self, index):
+        side = self.side
+        other = 3 - side
+        own_counts = self.counts[side]
+        other_counts = self.counts[other]
+        weights = WINDOW_WEIGHTS
+        k = self.k
+        delta = 0
+        for line in self.cell_lines[index]:
+            own = own_counts[line]
+            theirs = other_counts[line]
+            if not theirs:
+                delta += weights[own + 1] - weights[own]
+            elif not own:
+                delta += weights[theirs]
+            own_counts[line] = own + 1
+            if own + 1 == k:
+                self.winner = side
+        self.cells[index] = side
+        self.score += delta if side == X else -delta
+        self.hash ^= self.zobrist[index][side] ^ self.zobrist_side
+        self.moves += 1
+        self.side = other
+        self.history.append(divmod(index, self.cols))
+
+    def undo(self):
+        row, col = self.history.pop()
+        index = row * self.cols + col
+        side = self.cells[index]
+        own_counts = self.counts[side]
+        other_counts = self.counts[3 - side]
+        weights = WINDOW_WEIGHTS
+        delta = 0
+        for line in self.cell_lines[index]:
+            own = own_counts[line] - 1
+            theirs = other_counts[line]
+            if not theirs:
+                delta += weights[own + 1] - weights[own]
+            elif not own:
+                delta += weights[theirs]
+            own_counts[line] = own
+        self.cells[index] = EMPTY
+        self.score -= delta if side == X else -delta
+        self.hash ^= self.zobrist[index][side] ^ self.zobrist_side
+        self.moves -= 1
+        self.side = side
+        self.winner = EMPTY
+        return row, col
+
+    def make_move(self, row, col):
+        index = row * self.cols + col
+        if self.winner or self.cells[index]:
+            return False
+        self.play(index)
+        return True
+
+    def undo_move(self):
+        if not self.history:
+            return None
+        return self.undo()
+
+    def check_winner(self, player):
+        return SYMBOLS[self.winner] == player and self.winner != EMPTY
+
+    def is_draw(self):
+        return self.moves == self.size
+
+    def evaluate(self):
+        # Static score for the side to move
+        return self.score if self.side == X else -self.score
+
+
+def new_board(rows=3, cols=3, k=3):
+    # Classic tic-tac-toe gets the bitboard engine, everything else the m,n,k one
+    if (rows, cols, k) == (3, 3, 3):
+        return Board()
+    return MNKBoard(rows, cols, k)
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class Searcher:
+    def __init__(self, time_budget=1.0, max_depth=None, tt_limit=1 << 20):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.tt_limit = tt_limit
+        self.tt = {}
+        self.nodes = 0
+        self.depth_reached = 0
+
+    def candidates(self, board):
+        # Empty cells next to an existing stone; the centre on an empty board
+        cells = board.cells
+        if not board.moves:
+            return [(board.rows // 2) * board.cols + board.cols // 2]
+        if board.size <= 25:
+            return [i for i in range(board.size) if not cells[i]]
+        cols = board.cols
+        near = set()
+        for row, col in board.history:
+            for r in range(max(0, row - 1), min(board.rows, row + 2)):
+                for c in range(max(0, col - 1), min(cols, col + 2)):
+                    i = r * cols + c
+                    if not cells[i]:
+                        near.add(i)
+        if not near:
+            return [i for i in range(board.size) if not cells[i]]
+        return list(near)
+
+    def ordered_moves(self, board, tt_move):
+        # Cells that extend our lines or break the opponent's first
+        side = board.side
+        own_counts = board.counts[side]
+        other_counts = board.counts[3 - side]
+        weights = WINDOW_WEIGHTS
+        scored = []
+        for index in self.candidates(board):
+            value = 0
+            for line in board.cell_lines[index]:
+                own = own_counts[line]
+                theirs = other_counts[line]
+                if not theirs:
+                    value += weights[own + 1]
+                if not own:
+                    value += weights[theirs + 1] >> 1
+            scored.append((value, index))
+        scored.sort(reverse=True)
+        moves = [index for _, index in scored]
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
+
+    def best_move(self, board, time_budget=None, stop=None):
+        budget = self.time_budget if time_budget is None else time_budget
+        self.deadline = time.perf_counter() + budget
+        self.stop = stop
+        self.nodes = 0
+        self.depth_reached = 0
+        if len(self.tt) > self.tt_limit:
+            self.tt.clear()
+
+        board = board.copy()
+        moves = self.ordered_moves(board, None)
+        if board.winner or not moves:
+            return None
+        best = moves[0]
+        max_depth = board.size - board.moves
+        if self.max_depth:
+            max_depth = min(max_depth, self.max_depth)
+        for depth in range(1, max_depth + 1):
+            try:
+                score, move = self._root(board, depth, best)
+            except SearchTimeout:
+                break
+            best = move
+            self.depth_reached = depth
+            if abs(score) >= MATE_BOUND:
+                break
+        return divmod(best, board.cols)
+
+    def _root(self, board, depth, first):
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_move = first
+        best_score = -WIN_SCORE - 1
+        for move in self.ordered_moves(board, first):
+            board.play(move)
+            score = -self._search(board, depth - 1, -beta, -alpha, 1)
+            board.undo()
+            if score > best_score:
+                best_score, best_move = score, move
+            if score > alpha:
+                alpha = score
+        return best_score, best_move
+
+    def _search(self, board, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes & 63:
+            if time.perf_counter() > self.deadline or (self.stop is not None and self.stop.is_set()):
+                raise SearchTimeout()
+
+        if board.winner:
+            return -(WIN_SCORE - ply)
+        if board.moves == board.size:
+            return 0
+        if depth == 0:
+            return board.evaluate()
+
+        alpha0 = alpha
+        tt_move = None
+        entry = self.tt.get(board.hash)
+        if entry:
+            entry_depth, flag, value, tt_move = entry
+            if entry_depth >= depth:
+                # Mate scores are stored relative to the node, not the root
+                if value >= MATE_BOUND:
+                    value -= ply
+                elif value <= -MATE_BOUND:
+                    value += ply
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        best_score = -WIN_SCORE - 1
+        best_move = None
+        for move in self.ordered_moves(board, tt_move):
+            board.play(move)
+            score = -self._search(board, depth - 1, -beta, -alpha, ply + 1)
+            board.undo()
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= alpha0:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        stored = best_score
+        if stored >= MATE_BOUND:
+            stored += ply
+        elif stored <= -MATE_BOUND:
+            stored -= ply
+        self.tt[board.hash] = (depth, flag, stored, best_move)
+        return best_score
@@ -0,0 +1,215 @@
+import argparse
+import math
+import mmap
+import os
+import string
+import struct
+import sys
+from array import array
+
+# Diceware-style passphrases drawn from a local wordlist: one word per line,
+# optionally after a dice number ("11111<TAB>abacus", as in the EFF lists).
+# Blank lines and lines starting with "#" are ignored.
+WORDLIST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "passphrase_words.txt")
+
+# Offset index stored next to the wordlist as <wordlist>.idx: header, then a
+# (start, end) byte range per word. Both files are mmapped, so opening a list of
+# any size costs the same and looking up word i is two reads.
+INDEX_MAGIC = b"PWWI\x01\0\0\0"
+INDEX_HEADER = struct.Struct("<8sQQQ")  # magic, wordlist size, wordlist mtime_ns, word count
+RANGE = struct.Struct("<QQ")
+
+CAPITALIZE = ("none", "first", "words", "random")
+SYMBOLS = "!#$%&*+-=?@^_~"
+# Random numbers per os.urandom call when drawing words
+DRAW_BATCH = 1024
+
+
+class Wordlist:
+    def __init__(self, path=WORDLIST_FILE):
+        self.path = path
+        self.words = None  # mmap of the wordlist, opened on first use
+        self.ranges = None
+        self.count = 0
+
+    def _open(self):
+        # Fills in words, ranges and count only once the list is known to be usable,
+        # so a failed open is retried (and fails the same way) on the next lookup
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            words = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+        index_path = self.path + ".idx"
+        try:
+            ranges, count = _load_index(index_path, stat)
+        except (OSError, ValueError):
+            data = _build_index(words, stat)
+            try:
+                tmp = index_path + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, index_path)
+                ranges, count = _load_index(index_path, stat)
+            except OSError:
+                # Read-only directory: keep the index in memory for this process
+                ranges = memoryview(data)[INDEX_HEADER.size:]
+                count = INDEX_HEADER.unpack_from(data)[3]
+        if not count:
+            raise ValueError(f"{self.path} has no words")
+        self.ranges, self.count, self.words = ranges, count, words
+
+    def __len__(self):
+        if self.words is None:
+            self._open()
+        return self.count
+
+    def __getitem__(self, i):
+        if self.words is None:
+            self._open()
+        start, end = RANGE.unpack_from(self.ranges, i * RANGE.size)
+        return self.words[start:end].decode("utf-8")
+
+
+def _load_index(index_path, stat):
+    with open(index_path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, size, mtime, count = INDEX_HEADER.unpack_from(mm)
+    if magic != INDEX_MAGIC or size != stat.st_size or mtime != stat.st_mtime_ns:
+        raise ValueError(f"{index_path} is stale")
+    if len(mm) != INDEX_HEADER.size + count * RANGE.size:
+        raise ValueError(f"{index_path} is truncated")
+    return memoryview(mm)[INDEX_HEADER.size:], count
+
+
+def _build_index(words, stat):
+    # One scan of the wordlist, recording where the last token of each line sits
+    ranges = array("Q")
+    pos = 0
+    size = len(words)
+    while pos < size:
+        end = words.find(b"\n", pos)
+        if end < 0:
+            end = size
+        line = words[pos:end]
+        stripped = line.strip()
+        if stripped and not stripped.startswith(b"#"):
+            word = stripped.split()[-1]
+            start = pos + line.rindex(word)
+            ranges.extend((start, start + len(word)))
+        pos = end + 1
+    if sys.byteorder != "little":
+        ranges.byteswap()
+    return INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(ranges) // 2) + ranges.tobytes()
+
+
+_wordlists = {}
+
+
+def get_wordlist(path=WORDLIST_FILE):
+    # One Wordlist per path and process; nothing is read until the first lookup
+    if path not in _wordlists:
+        if not os.path.exists(path):
+            raise ValueError(f"No wordlist at {path}. Save a Diceware list (one word per line) there.")
+        _wordlists[path] = Wordlist(path)
+    return _wordlists[path]
+
+
+def _random_below(n, count):
+    # count uniform integers in [0, n) from os.urandom, by rejection on 32 bits
+    limit = (1 << 32) - (1 << 32) % n
+    values = []
+    while len(values) < count:
+        block = array("I", os.urandom(4 * max(count - len(values), 16)))
+        values.extend(v % n for v in block if v < limit)
+    return values[:count]
+
+
+def passphrase_entropy(words, wordlist_size, capitalize="none", digit=False, symbol=False):
+    # Bits of randomness in passphrases made with these options
+    bits = words * math.log2(wordlist_size)
+    if capitalize == "random":
+        bits += words
+    if digit:
+        bits += math.log2(10 * words)
+    if symbol:
+        bits += math.log2(len(SYMBOLS) * words)
+    return bits
+
+
+def iter_passphrases(count, words=6, separator="-", capitalize="none", digit=False, symbol=False,
+                     path=WORDLIST_FILE):
+    # digit / symbol append one random digit / symbol to a randomly chosen word
+    if words < 1:
+        raise ValueError("A passphrase needs at least one word.")
+    if capitalize not in CAPITALIZE:
+        raise ValueError(f"capitalize must be one of {', '.join(CAPITALIZE)}")
+    wordlist = get_wordlist(path)
+    n = len(wordlist)
+    per_batch = max(1, DRAW_BATCH // words)
+    made = 0
+    while made < count:
+        batch = min(per_batch, count - made)
+        picks = iter(_random_below(n, batch * words))
+        coins = iter(_random_below(2, batch * words) if capitalize == "random" else ())
+        slots = iter(_random_below(words, batch * 2))
+        digits = iter(_random_below(10, batch) if digit else ())
+        symbols = iter(_random_below(len(SYMBOLS), batch) if symbol else ())
+        for _ in range(batch):
+            chosen = [wordlist[next(picks)] for _ in range(words)]
+            if capitalize == "first":
+                chosen[0] = chosen[0].capitalize()
+            elif capitalize == "words":
+                chosen = [w.capitalize() for w in chosen]
+            elif capitalize == "random":
+                chosen = [w.capitalize() if next(coins) else w for w in chosen]
+            slot = next(slots)
+            if digit:
+                chosen[slot] += string.digits[next(digits)]
+            slot = next(slots)
+            if symbol:
+                chosen[slot] += SYMBOLS[next(symbols)]
+            yield separator.join(chosen)
+        made += batch
+
+
+def generate_passphrase(words=6, separator="-", capitalize="none", digit=False, symbol=False,
+                        path=WORDLIST_FILE):
+    return next(iter_passphrases(1, words, separator, capitalize, digit, symbol, path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Diceware passphrases in bulk")
+    parser.add_argument("-n", "--count", type=int, default=1, help="number of passphrases")
+    parser.add_argument("-w", "--words", type=int, default=6)
+    parser.add_argument("-s", "--separator", default="-")
+    parser.add_argument("--capitalize", choices=CAPITALIZE, default="none")
+    parser.add_argument("--digit", action="store_true", help="append a digit to one word")
+    parser.add_argument("--symbol", action="store_true", help="append a symbol to one word")
+    parser.add_argument("--wordlist", metavar="PATH", default=WORDLIST_FILE)
+    parser.add_argument("-o", "--output", metavar="PATH", help="write to PATH instead of stdout")
+    args = parser.parse_args(argv)
+    options = dict(words=args.words, separator=args.separator, capitalize=args.capitalize,
+                   digit=args.digit, symbol=args.symbol)
+    try:
+        size = len(get_wordlist(args.wordlist))
+        passphrases = iter_passphrases(args.count, path=args.wordlist, **options)
+        out = open(args.output, "w", encoding="utf-8", newline="\n") if args.output else sys.stdout
+        try:
+            batch = []
+            for p in passphrases:
+                batch.append(p)
+                if len(batch) == DRAW_BATCH:
+                    out.write("\n".join(batch) + "\n")
+                    batch.clear()
+            if batch:
+                out.write("\n".join(batch) + "\n")
+        finally:
+            if args.output:
+                out.close()
+    except ValueError as e:
+        sys.exit(str(e))
+    bits = passphrase_entropy(args.words, size, args.capitalize, args.digit, args.symbol)
+    print(f"{size:,} words, {bits:.1f} bits per passphrase", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
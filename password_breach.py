@@ -0,0 +1,293 @@
+import argparse
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from functools import lru_cache
+
+np = None  # imported on first use by _numpy(); lookups work one key at a time without it
+
+# Offline list of known-bad passwords, built from a corpus by
+#   python password_breach.py build CORPUS [-o PATH] [--bloom]
+# The corpus holds one password per line, or SHA-1 hashes in the usual
+# "HEX:COUNT" dump format. Either way a password is keyed by the first 64 bits
+# of its SHA-1, so both kinds of corpus give the same index.
+BREACH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "password_breach.idx")
+
+# Sorted index: header, then 65537 bucket offsets (entry number where each top
+# 16-bit prefix starts), then the sorted, deduplicated keys
+SORTED_MAGIC = b"PWBS\x01\0\0\0"
+SORTED_HEADER = struct.Struct("<8sQ")  # magic, number of keys
+BUCKET_BITS = 16
+BUCKETS = struct.Struct(f"<{(1 << BUCKET_BITS) + 1}Q")
+KEY = struct.Struct("<Q")
+
+# Bloom filter: header, then the bit array (bit i is byte i >> 3, bit i & 7)
+BLOOM_MAGIC = b"PWBF\x01\0\0\0"
+BLOOM_HEADER = struct.Struct("<8sQQ")  # magic, number of bits, number of hashes
+DEFAULT_FP_RATE = 0.001
+
+# Keys sorted in memory per run of the external sort (8 bytes each)
+RUN_SIZE = 4_000_000
+HASH_LINE = re.compile(rb"^([0-9A-Fa-f]{40})(:\d+)?$")
+
+
+def password_key(password):
+    return int.from_bytes(hashlib.sha1(password.encode("utf-8")).digest()[:8], "big")
+
+
+def iter_corpus_keys(path, fmt="auto"):
+    # fmt: "plain" (passwords), "sha1" (hex hashes) or "auto" (decide per line)
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.rstrip(b"\r\n")
+            if not line:
+                continue
+            match = HASH_LINE.match(line) if fmt != "plain" else None
+            if match:
+                yield int(match.group(1)[:16], 16)
+            elif fmt == "sha1":
+                raise ValueError(f"Not a SHA-1 hash line: {line[:60]!r}")
+            else:
+                yield int.from_bytes(hashlib.sha1(line).digest()[:8], "big")
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    # NumPy (or None) on first use: importing it takes longer than the rest of the
+    # app, so the strength scorer loads it through here as well
+    global np
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    return np
+
+
+def _write_run(keys, directory):
+    f = tempfile.TemporaryFile(dir=directory)
+    if _numpy() is not None:
+        f.write(np.unique(np.frombuffer(keys, dtype=np.uint64)).astype("<u8").tobytes())
+    else:
+        f.write(b"".join(KEY.pack(k) for k in sorted(set(keys))))
+    f.seek(0)
+    return f
+
+
+def _read_run(f, block=1 << 16):
+    while True:
+        data = f.read(block * KEY.size)
+        if not data:
+            return
+        for (key,) in KEY.iter_unpack(data):
+            yield key
+
+
+def build_sorted(corpus, path=BREACH_FILE, fmt="auto", run_size=RUN_SIZE):
+    # External sort: sorted runs in temporary files, merged straight into the index
+    directory = os.path.dirname(os.path.abspath(path))
+    runs = []
+    keys = array("Q")
+    for key in iter_corpus_keys(corpus, fmt):
+        keys.append(key)
+        if len(keys) >= run_size:
+            runs.append(_write_run(keys, directory))
+            keys = array("Q")
+    if keys or not runs:
+        runs.append(_write_run(keys, directory))
+
+    buckets = [0] * ((1 << BUCKET_BITS) + 1)
+    count = 0
+    try:
+        with open(path, "wb") as out:
+            out.write(SORTED_HEADER.pack(SORTED_MAGIC, 0) + BUCKETS.pack(*buckets))
+            previous = None
+            batch = []
+            for key in heapq.merge(*(_read_run(f) for f in runs)):
+                if key == previous:
+                    continue
+                previous = key
+                buckets[(key >> (64 - BUCKET_BITS)) + 1] += 1
+                batch.append(key)
+                if len(batch) == 65536:
+                    out.write(struct.pack(f"<{len(batch)}Q", *batch))
+                    count += len(batch)
+                    batch.clear()
+            out.write(struct.pack(f"<{len(batch)}Q", *batch))
+            count += len(batch)
+            for i in range(1, len(buckets)):
+                buckets[i] += buckets[i - 1]
+            out.seek(0)
+            out.write(SORTED_HEADER.pack(SORTED_MAGIC, count) + BUCKETS.pack(*buckets))
+    finally:
+        for f in runs:
+            f.close()
+    return count
+
+
+def bloom_parameters(count, fp_rate=DEFAULT_FP_RATE):
+    # Bits and hash count giving roughly fp_rate false positives for count entries
+    bits = max(64, math.ceil(-count * math.log(fp_rate) / math.log(2) ** 2))
+    bits = (bits + 7) // 8 * 8
+    hashes = max(1, round(bits / max(count, 1) * math.log(2)))
+    return bits, hashes
+
+
+def _bloom_positions(key, bits, hashes):
+    # Double hashing over the 64-bit key: h1 + i * h2
+    h1 = key >> 32
+    h2 = (key & 0xFFFFFFFF) | 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+def build_bloom(corpus, path=BREACH_FILE, fmt="auto", fp_rate=DEFAULT_FP_RATE):
+    # Two passes over the corpus: one to size the filter, one to fill it
+    count = sum(1 for _ in iter_corpus_keys(corpus, fmt))
+    bits, hashes = bloom_parameters(count, fp_rate)
+    filter_bits = bytearray(bits // 8)
+    for key in iter_corpus_keys(corpus, fmt):
+        for pos in _bloom_positions(key, bits, hashes):
+            filter_bits[pos >> 3] |= 1 << (pos & 7)
+    with open(path, "wb") as out:
+        out.write(BLOOM_HEADER.pack(BLOOM_MAGIC, bits, hashes))
+        out.write(filter_bits)
+    return count
+
+
+class SortedIndex:
+    # Exact (up to 64-bit hash collisions) membership by binary search in the mmap
+    def __init__(self, path, mm):
+        self.path = path
+        self.mm = mm
+        magic, self.count = SORTED_HEADER.unpack_from(mm, 0)
+        self.buckets = BUCKETS.unpack_from(mm, SORTED_HEADER.size)
+        self.offset = SORTED_HEADER.size + BUCKETS.size
+        if len(mm) != self.offset + self.count * KEY.size:
+            raise ValueError(f"{path} is truncated")
+
+    def contains_key(self, key):
+        bucket = key >> (64 - BUCKET_BITS)
+        lo, hi = self.buckets[bucket], self.buckets[bucket + 1]
+        mm, offset, size = self.mm, self.offset, KEY.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            (probe,) = KEY.unpack_from(mm, offset + mid * size)
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def contains_keys(self, keys):
+        if _numpy() is None or not self.count:
+            return [self.contains_key(k) for k in keys]
+        table = np.frombuffer(self.mm, dtype="<u8", count=self.count, offset=self.offset)
+        keys = np.asarray(keys, dtype=np.uint64)
+        found = np.searchsorted(table, keys)
+        return table[np.minimum(found, self.count - 1)] == keys
+
+
+class BloomIndex:
+    # Probabilistic membership: never misses a listed password, rarely flags others
+    def __init__(self, path, mm):
+        self.path = path
+        self.mm = mm
+        magic, self.bits, self.hashes = BLOOM_HEADER.unpack_from(mm, 0)
+        self.offset = BLOOM_HEADER.size
+        if len(mm) != self.offset + self.bits // 8:
+            raise ValueError(f"{path} is truncated")
+
+    def contains_key(self, key):
+        mm, offset = self.mm, self.offset
+        for pos in _bloom_positions(key, self.bits, self.hashes):
+            if not mm[offset + (pos >> 3)] >> (pos & 7) & 1:
+                return False
+        return True
+
+    def contains_keys(self, keys):
+        return [self.contains_key(k) for k in keys]
+
+
+def open_index(path=BREACH_FILE):
+    # Maps the file read-only; nothing is loaded until a lookup touches a page
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic = mm[:8]
+    if magic == SORTED_MAGIC:
+        return SortedIndex(path, mm)
+    if magic == BLOOM_MAGIC:
+        return BloomIndex(path, mm)
+    mm.close()
+    raise ValueError(f"{path} is not a password breach index")
+
+
+_indexes = {}
+
+
+def get_index(path=BREACH_FILE):
+    # The index at path, or None when there is none; opened once per process
+    if path not in _indexes:
+        try:
+            _indexes[path] = open_index(path)
+        except (OSError, ValueError):
+            _indexes[path] = None
+    return _indexes[path]
+
+
+def is_breached(password, path=BREACH_FILE):
+    index = get_index(path)
+    return index is not None and index.contains_key(password_key(password))
+
+
+def breached_mask(passwords, path=BREACH_FILE):
+    # One bool per password; all False when there is no index
+    index = get_index(path)
+    if index is None:
+        return [False] * len(passwords)
+    return index.contains_keys([password_key(p) for p in passwords])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the offline breached-password index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build an index from a corpus file")
+    build.add_argument("corpus")
+    build.add_argument("-o", "--output", metavar="PATH", default=BREACH_FILE)
+    build.add_argument("--format", choices=("auto", "plain", "sha1"), default="auto",
+                       help="corpus lines are passwords, SHA-1 hex hashes, or either (default)")
+    build.add_argument("--bloom", action="store_true", help="build a Bloom filter instead of a sorted hash file")
+    build.add_argument("--fp-rate", type=float, default=DEFAULT_FP_RATE,
+                       help="Bloom filter false-positive rate (default 0.001)")
+    check = commands.add_parser("check", help="look passwords up in an index")
+    check.add_argument("passwords", nargs="+")
+    check.add_argument("-i", "--index", metavar="PATH", default=BREACH_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        if not os.path.exists(args.corpus):
+            sys.exit(f"{args.corpus} does not exist")
+        try:
+            if args.bloom:
+                count = build_bloom(args.corpus, args.output, args.format, args.fp_rate)
+            else:
+                count = build_sorted(args.corpus, args.output, args.format)
+        except ValueError as e:
+            sys.exit(str(e))
+        print(f"Indexed {count:,} entries in {args.output}")
+    else:
+        if get_index(args.index) is None:
+            sys.exit(f"{args.index} is missing or not a breach index")
+        for password in args.passwords:
+            print(f"{password}: {'BREACHED' if is_breached(password, args.index) else 'not found'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import os
+import queue
+import string
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from functools import lru_cache
+
+import password_breach
+import password_export
+
+SIMILAR_CHARS = set("O0oIl1")
+
+# Passwords produced per block of random bytes; memory use depends on this, not on N
+BATCH_SIZE = 4096
+# Passwords per task in parallel mode, and tasks in flight per worker; the writer
+# falling behind stops new tasks from being handed out
+CHUNK_SIZE = 50_000
+PENDING_PER_WORKER = 2
+# Draws generate_password makes before giving up on finding an unbreached password
+BREACH_ATTEMPTS = 1000
+
+
+# Everything generation needs for one option set, built once by compile_charset:
+#   alphabet    the pool as Latin-1 bytes, duplicates removed
+#   categories  one sub-alphabet (bytes) per category a password must include
+#   limit       random bytes >= limit are rejected so every pool byte is equally likely
+#   table       bytes.translate table mapping a random byte onto the pool
+#   reject      the rejected bytes, deleted by the same translate call
+#   required    the categories as frozensets of characters, for the coverage check
+Charset = namedtuple("Charset", "alphabet categories limit table reject required")
+
+
+@lru_cache(maxsize=64)
+def compile_charset(use_upper=True, use_lower=True, use_digits=True, use_symbols=False,
+                    avoid_similar=False, custom=(), exclude=""):
+    # custom is a tuple of extra user-defined categories; exclude lists characters
+    # to leave out everywhere (on top of SIMILAR_CHARS when avoid_similar is set)
+    categories = []
+    if use_upper:
+        categories.append(string.ascii_uppercase)
+    if use_lower:
+        categories.append(string.ascii_lowercase)
+    if use_digits:
+        categories.append(string.digits)
+    if use_symbols:
+        categories.append(string.punctuation)
+    categories.extend(custom)
+    if not categories:
+        raise ValueError("Please select at least one character type.")
+
+    excluded = set(exclude) | (SIMILAR_CHARS if avoid_similar else set())
+    alphabet = []
+    seen = set()
+    compiled = []
+    for cat in categories:
+        chars = "".join(dict.fromkeys(c for c in cat if c not in excluded))
+        if not chars:
+            continue
+        try:
+            compiled.append(chars.encode("latin-1"))
+        except UnicodeEncodeError:
+            raise ValueError("Custom characters must be in the Latin-1 range.") from None
+        for c in chars:
+            if c not in seen:
+                seen.add(c)
+                alphabet.append(c)
+    if not alphabet:
+        raise ValueError("Every selected character is excluded.")
+
+    pool = "".join(alphabet).encode("latin-1")
+    limit = 256 - 256 % len(pool)
+    table = bytes(pool[b % len(pool)] if b < limit else 0 for b in range(256))
+    required = tuple(frozenset(cat.decode("latin-1")) for cat in compiled)
+    return Charset(pool, tuple(compiled), limit, table, bytes(range(limit, 256)), required)
+
+
+def iter_passwords(count, length, use_upper=True, use_lower=True, use_digits=True,
+                   use_symbols=False, avoid_similar=False, custom=(), exclude=""):
+    # Yields `count` passwords drawn from os.urandom. Candidates missing a selected
+    # category are redrawn, so when length allows every category appears at least
+    # once and all such passwords are equally likely.
+    charset = compile_charset(use_upper, use_lower, use_digits, use_symbols,
+                              avoid_similar, tuple(custom), exclude)
+    table, reject = charset.table, charset.reject
+    required = charset.required if length >= len(charset.required) else ()
+    # Random bytes per block, allowing for the rejected share
+    block_size = length * min(BATCH_SIZE, count or 1) * 256 // charset.limit + 64
+
+    made = 0
+    while made < count:
+        chars = os.urandom(block_size).translate(table, reject).decode("latin-1")
+        for start in range(0, len(chars) - length + 1, length):
+            password = chars[start:start + length]
+            if all(not cat.isdisjoint(password) for cat in required):
+                yield password
+                made += 1
+                if made == count:
+                    return
+
+
+def generate_password(length, use_upper=True, use_lower=True, use_digits=True,
+                      use_symbols=False, avoid_similar=False, custom=(), exclude="",
+                      check_breached=True):
+    # Passwords found in the offline breach index (when one is installed) are redrawn
+    index = password_breach.get_index() if check_breached else None
+    for _ in range(BREACH_ATTEMPTS):
+        password = next(iter_passwords(1, length, use_upper, use_lower, use_digits, use_symbols,
+                                       avoid_similar, custom, exclude))
+        if index is None or not index.contains_key(password_breach.password_key(password)):
+            return password
+    raise ValueError("Every password tried is in the breach list; try a longer length.")
+
+
+def write_passwords(out, count, length, **options):
+    # One password per line, written a batch at a time
+    batch = []
+    for password in iter_passwords(count, length, **options):
+        batch.append(password)
+        if len(batch) == BATCH_SIZE:
+            out.write("\n".join(batch) + "\n")
+            batch.clear()
+    if batch:
+        out.write("\n".join(batch) + "\n")
+
+
+def _charset_options(options):
+    # Keyword options as compile_charset takes them (custom must be hashable)
+    options = dict(options)
+    if "custom" in options:
+        options["custom"] = tuple(options["custom"])
+    return options
+
+
+def _generate_chunk(count, length, options):
+    return list(iter_passwords(count, length, **options))
+
+
+def iter_password_chunks(count, length, workers=None, unique=False, chunk_size=CHUNK_SIZE, **options):
+    # Generates on a process pool and yields lists of passwords in submission order.
+    # With unique=True duplicates are dropped (tracked by hash, so memory is a few
+    # dozen bytes per password) and extra chunks make up the difference.
+    space = len(compile_charset(**_charset_options(options)).alphabet) ** length
+    if unique and count > space:
+        raise ValueError(f"Only {space:,} different passwords exist for these options.")
+    workers = workers or os.cpu_count() or 1
+    seen = set() if unique else None
+    stalled = 0
+    produced = 0
+    requested = 0
+    pending = deque()
+    from concurrent.futures import ProcessPoolExecutor  # deferred: the GUI never needs a pool
+    with ProcessPoolExecutor(workers) as pool:
+        while produced < count:
+            while len(pending) < workers * PENDING_PER_WORKER and produced + requested < count:
+                n = min(chunk_size, count - produced - requested)
+                if unique:
+                    # Ask for extra so the last few missing passwords turn up quickly
+                    n = min(chunk_size, max(2 * n, BATCH_SIZE))
+                pending.append((n, pool.submit(_generate_chunk, n, length, options)))
+                requested += n
+            n, future = pending.popleft()
+            requested -= n
+            chunk = future.result()
+            if seen is not None:
+                fresh = []
+                for password in chunk:
+                    key = hash(password)
+                    if key not in seen:
+                        seen.add(key)
+                        fresh.append(password)
+                        if produced + len(fresh) == count:
+                            break
+                # Close to exhausting the space (e.g. the category rule rules out
+                # more than expected): give up rather than spin forever
+                stalled = 0 if fresh else stalled + 1
+                if stalled > 100:
+                    raise ValueError("Could not find enough unique passwords for these options.")
+                chunk = fresh
+            produced += len(chunk)
+            if chunk:
+                yield chunk
+
+
+def write_passwords_parallel(out, count, length, workers=None, unique=False,
+                             chunk_size=CHUNK_SIZE, **options):
+    # Writes on a separate thread fed through a bounded queue, so disk I/O overlaps
+    # with collecting results; returns (passwords written, seconds taken)
+    workers = workers or os.cpu_count() or 1
+    chunks = queue.Queue(maxsize=workers * PENDING_PER_WORKER)
+    failed = []
+
+    def writer():
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                return
+            if not failed:
+                try:
+                    out.write("\n".join(chunk) + "\n")
+                except Exception as e:
+                    failed.append(e)
+
+    thread = threading.Thread(target=writer, name="password writer")
+    thread.start()
+    start = time.perf_counter()
+    written = 0
+    try:
+        for chunk in iter_password_chunks(count, length, workers, unique, chunk_size, **options):
+            if failed:
+                break
+            chunks.put(chunk)
+            written += len(chunk)
+    finally:
+        chunks.put(None)
+        thread.join()
+    if failed:
+        raise failed[0]
+    return written, time.perf_counter() - start
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate passwords in bulk")
+    parser.add_argument("-n", "--count", type=int, default=1, help="number of passwords")
+    parser.add_argument("-l", "--length", type=int, default=12)
+    parser.add_argument("--no-upper", dest="upper", action="store_false", help="leave out uppercase letters")
+    parser.add_argument("--no-lower", dest="lower", action="store_false", help="leave out lowercase letters")
+    parser.add_argument("--no-digits", dest="digits", action="store_false", help="leave out digits")
+    parser.add_argument("--symbols", action="store_true", help="include symbols")
+    parser.add_argument("--avoid-similar", action="store_true", help="leave out O/0 o I/l/1")
+    parser.add_argument("--custom", metavar="CHARS", action="append", default=[],
+                        help="extra character category that every password must use (repeatable)")
+    parser.add_argument("--exclude", metavar="CHARS", default="", help="characters never to use")
+    parser.add_argument("-o", "--output", metavar="PATH", help="write to PATH instead of stdout")
+    parser.add_argument("--compress", choices=list(password_export.COMPRESSIONS),
+                        help="compress the output file (default: from its extension)")
+    parser.add_argument("--encrypt", action="store_true",
+                        help="encrypt the output file with a passphrase (asked for on the terminal)")
+    parser.add_argument("-j", "--workers", type=int, default=0,
+                        help="generate on this many processes (0: all cores); implied by --unique")
+    parser.add_argument("--parallel", action="store_true", help="use the multi-process generator")
+    parser.add_argument("--unique", action="store_true", help="never repeat a password within the run")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.length < 1:
+        sys.exit("Length must be at least 1")
+    options = dict(use_upper=args.upper, use_lower=args.lower, use_digits=args.digits,
+                   use_symbols=args.symbols, avoid_similar=args.avoid_similar,
+                   custom=tuple(args.custom), exclude=args.exclude)
+    try:
+        space = len(compile_charset(**options).alphabet) ** args.length
+    except ValueError as e:
+        sys.exit(str(e))
+    if args.unique and args.count > space:
+        sys.exit(f"Only {space:,} different passwords exist for these options.")
+    compression = args.compress or (password_export.compression_for_path(args.output) if args.output else None)
+    if (compression or args.encrypt) and not args.output:
+        sys.exit("--compress and --encrypt need an output file (-o)")
+    if compression or args.encrypt:
+        try:
+            passphrase = password_export.ask_passphrase() if args.encrypt else None
+        except (ValueError, EOFError) as e:
+            sys.exit(str(e))
+        out = password_export.ExportWriter(args.output, compression, passphrase)
+    elif args.output:
+        out = open(args.output, "w", encoding="utf-8", newline="\n")
+    else:
+        out = sys.stdout
+    try:
+        if args.parallel or args.workers or args.unique:
+            try:
+                written, seconds = write_passwords_parallel(out, args.count, args.length, args.workers or None,
+                                                            args.unique, **options)
+            except ValueError as e:
+                sys.exit(str(e))
+            print(f"{written:,} passwords in {seconds:.2f}s "
+                  f"({written / seconds if seconds else 0:,.0f}/s)", file=sys.stderr)
+        else:
+            write_passwords(out, args.count, args.length, **options)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import argparse
+import bz2
+import getpass
+import hashlib
+import hmac
+import lzma
+import os
+import queue
+import struct
+import sys
+import threading
+import zlib
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
+# Streaming export of passwords (one per line) with optional compression and
+# passphrase encryption. Nothing is held in memory beyond one chunk, so the
+# same writer serves the GUI history and the headless bulk generator.
+CHUNK_SIZE = 1 << 16
+
+COMPRESSIONS = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+if zstd is not None:
+    COMPRESSIONS["zstd"] = ".zst"
+
+# Encrypted files: header, then frames of
+#   <I length (bit 31 set on the last frame)>, ciphertext, 32-byte HMAC-SHA256 tag
+# The keystream for frame i is SHAKE-256(key | nonce | i) and each tag covers the
+# header, the frame number and the frame itself, so frames cannot be cut, swapped
+# or dropped without detection. Keys come from scrypt over the passphrase.
+ENCRYPT_MAGIC = b"PWEX\x01"
+ENCRYPT_HEADER = struct.Struct("<5s16s16sBBB")  # magic, salt, nonce, log2(n), r, p
+FRAME = struct.Struct("<I")
+LAST_FRAME = 1 << 31
+TAG_SIZE = 32
+SCRYPT_LOG2_N, SCRYPT_R, SCRYPT_P = 15, 8, 1
+
+
+def compression_for_path(path):
+    # Compression implied by the file extension, or None
+    for name, ext in COMPRESSIONS.items():
+        if path.endswith(ext) or path.endswith(ext + ".enc"):
+            return name
+    return None
+
+
+def _compressor(name):
+    if name is None:
+        return None
+    if name == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if name == "bz2":
+        return bz2.BZ2Compressor(9)
+    if name == "xz":
+        return lzma.LZMACompressor()
+    if name == "zstd" and zstd is not None:
+        return zstd.ZstdCompressor()
+    raise ValueError(f"Unknown compression: {name}")
+
+
+def _decompressor(name):
+    if name is None:
+        return None
+    if name == "gzip":
+        return zlib.decompressobj(31)
+    if name == "bz2":
+        return bz2.BZ2Decompressor()
+    if name == "xz":
+        return lzma.LZMADecompressor()
+    if name == "zstd" and zstd is not None:
+        return zstd.ZstdDecompressor()
+    raise ValueError(f"Unknown compression: {name}")
+
+
+def _derive_keys(passphrase, salt, log2_n=SCRYPT_LOG2_N, r=SCRYPT_R, p=SCRYPT_P):
+    key = hashlib.scrypt(passphrase.encode("utf-8"), salt=salt, n=1 << log2_n, r=r, p=p,
+                         maxmem=256 * r * (1 << log2_n) + (1 << 20), dklen=64)
+    return key[:32], key[32:]
+
+
+def _xor(data, pad):
+    return (int.from_bytes(data, "little") ^ int.from_bytes(pad, "little")).to_bytes(len(data), "little")
+
+
+class _Encryptor:
+    def __init__(self, raw, passphrase):
+        salt, nonce = os.urandom(16), os.urandom(16)
+        self.raw = raw
+        self.header = ENCRYPT_HEADER.pack(ENCRYPT_MAGIC, salt, nonce, SCRYPT_LOG2_N, SCRYPT_R, SCRYPT_P)
+        self.enc_key, self.mac_key = _derive_keys(passphrase, salt)
+        self.nonce = nonce
+        self.frames = 0
+        raw.write(self.header)
+
+    def write(self, data, last=False):
+        index = self.frames.to_bytes(8, "little")
+        pad = hashlib.shake_256(self.enc_key + self.nonce + index).digest(len(data)) if data else b""
+        frame = FRAME.pack(len(data) | (LAST_FRAME if last else 0)) + _xor(data, pad)
+        tag = hmac.new(self.mac_key, self.header + index + frame, hashlib.sha256).digest()
+        self.raw.write(frame + tag)
+        self.frames += 1
+
+
+class ExportWriter:
+    # File-like (write/close, usable with `with`) sink for text. compression is a
+    # COMPRESSIONS key or None; a passphrase turns on encryption. Plain, unencrypted
+    # exports append to an existing file; anything else replaces it.
+    def __init__(self, path, compression=None, passphrase=None, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.compressor = _compressor(compression)
+        self.raw = open(path, "ab" if compression is None and passphrase is None else "wb")
+        self.encryptor = _Encryptor(self.raw, passphrase) if passphrase else None
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.buffered = 0
+        self.closed = False
+
+    def write(self, text):
+        self.buffer.append(text.encode("utf-8"))
+        self.buffered += len(self.buffer[-1])
+        if self.buffered >= self.chunk_size:
+            self._flush_buffer()
+        return len(text)
+
+    def _flush_buffer(self, last=False):
+        data = b"".join(self.buffer)
+        self.buffer.clear()
+        self.buffered = 0
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+            if last:
+                data += self.compressor.flush()
+        if self.encryptor is None:
+            self.raw.write(data)
+            return
+        # Encrypt in frames of at most chunk_size so readers never need more memory
+        for start in range(0, len(data), self.chunk_size):
+            self.encryptor.write(data[start:start + self.chunk_size])
+        if last:
+            self.encryptor.write(b"", last=True)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._flush_buffer(last=True)
+        finally:
+            self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _iter_decrypted(f, passphrase):
+    header = f.read(ENCRYPT_HEADER.size)
+    magic, salt, nonce, log2_n, r, p = ENCRYPT_HEADER.unpack(header)
+    enc_key, mac_key = _derive_keys(passphrase, salt, log2_n, r, p)
+    frames = 0
+    while True:
+        head = f.read(FRAME.size)
+        if len(head) < FRAME.size:
+            raise ValueError("Export is truncated")
+        (length,) = FRAME.unpack(head)
+        last = bool(length & LAST_FRAME)
+        length &= ~LAST_FRAME
+        data = f.read(length)
+        tag = f.read(TAG_SIZE)
+        index = frames.to_bytes(8, "little")
+        expected = hmac.new(mac_key, header + index + head + data, hashlib.sha256).digest()
+        if len(data) < length or not hmac.compare_digest(tag, expected):
+            raise ValueError("Wrong passphrase or corrupted export")
+        frames += 1
+        if data:
+            yield _xor(data, hashlib.shake_256(enc_key + nonce + index).digest(length))
+        if last:
+            return
+
+
+def is_encrypted(path):
+    with open(path, "rb") as f:
+        return f.read(len(ENCRYPT_MAGIC)) == ENCRYPT_MAGIC
+
+
+def iter_export(path, compression=None, passphrase=None, chunk_size=CHUNK_SIZE):
+    # Yields the passwords in an export, a chunk at a time
+    with open(path, "rb") as f:
+        if is_encrypted(path):
+            if passphrase is None:
+                raise ValueError("This export is encrypted; a passphrase is needed")
+            blocks = _iter_decrypted(f, passphrase)
+        else:
+            blocks = iter(lambda: f.read(chunk_size), b"")
+        decompressor = _decompressor(compression)
+        tail = b""
+        for block in blocks:
+            if decompressor is not None:
+                block = decompressor.decompress(block)
+            lines = (tail + block).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                yield line.decode("utf-8")
+        if tail:
+            yield tail.decode("utf-8")
+
+
+class ExportJob:
+    # Writes passwords on a background thread. Progress goes into a queue as
+    # (written, total) tuples, followed by ("done", written) or ("error", exc); the
+    # UI drains it from an after() callback, so Tk is only touched on its own thread.
+    def __init__(self, path, passwords, total=None, compression=None, passphrase=None,
+                 progress_every=CHUNK_SIZE // 16):
+        self.path = path
+        self.passwords = passwords
+        self.total = total
+        self.compression = compression
+        self.passphrase = passphrase
+        self.progress_every = progress_every
+        self.events = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="password export", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _run(self):
+        written = 0
+        try:
+            with ExportWriter(self.path, self.compression, self.passphrase) as out:
+                for password in self.passwords:
+                    if self.cancelled.is_set():
+                        break
+                    out.write(password + "\n")
+                    written += 1
+                    if written % self.progress_every == 0:
+                        self.events.put((written, self.total))
+        except Exception as e:
+            self.events.put(("error", e))
+            return
+        self.events.put(("done", written))
+
+    def poll(self):
+        # Events queued since the last call
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+
+def ask_passphrase(confirm=True):
+    passphrase = getpass.getpass("Passphrase: ")
+    if confirm and getpass.getpass("Repeat passphrase: ") != passphrase:
+        raise ValueError("Passphrases do not match")
+    if not passphrase:
+        raise ValueError("Empty passphrase")
+    return passphrase
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the passwords in an export file")
+    parser.add_argument("path")
+    parser.add_argument("--compression", choices=list(COMPRESSIONS),
+                        help="default: from the file extension")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.path):
+        sys.exit(f"{args.path} does not exist")
+    compression = args.compression or compression_for_path(args.path)
+    try:
+        passphrase = ask_passphrase(confirm=False) if is_encrypted(args.path) else None
+        for password in iter_export(args.path, compression, passphrase):
+            print(password)
+    except (ValueError, OSError, EOFError, lzma.LZMAError, zlib.error) as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,31 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import random
-import string
-import pyperclip
 import os
+import passphrase
+import password_engine
+import password_export
+import password_strength
+from password_history import MAX_HISTORY, PasswordHistory
+
+# tkinter (and the widgets below) only exist once main() has built the window,
+# so the module imports quickly and without a display
+tk = ttk = messagebox = filedialog = simpledialog = tkfont = None
 
 # ---------- Config ----------
-SIMILAR_CHARS = set("O0oIl1")
 THEMES = {
     "Light": {"bg": "#ffffff", "fg": "#000000", "entry_bg": "#ffffff"},
     "Dark": {"bg": "#000000", "fg": "#ffffff", "entry_bg": "#020202"},
     "Ocean": {"bg": "#215e6f", "fg": "#ffffff", "entry_bg": "#458CA0"}
 }
-MAX_HISTORY = 10
 
 # ---------- State ----------
-password_history = []
+password_history = PasswordHistory(MAX_HISTORY)
+# The history listbox only ever holds the rows on screen: history_rows maps view
+# positions to history positions (None: no filter, everything in order) and
+# history_top is the first view position shown
+history_rows = None
+history_top = 0
+history_visible = 8
+export_job = None
+EXPORT_POLL_MS = 50
 
 # ---------- Helpers ----------
 def apply_theme(theme_name):
@@ -44,49 +54,146 @@ def _apply_theme_recursive(widget, theme):
     for child in widget.winfo_children():
         _apply_theme_recursive(child, theme)
 
-def update_strength(password):
-    length = len(password)
-    categories = sum([
-        any(c.islower() for c in password),
-        any(c.isupper() for c in password),
-        any(c.isdigit() for c in password),
-        any(c in string.punctuation for c in password)
-    ])
-    if length >= 12 and categories >= 3:
-        strength_label.config(text="Strength: Strong", foreground="green")
-    elif length >= 8 and categories >= 2:
-        strength_label.config(text="Strength: Medium", foreground="orange")
-    else:
-        strength_label.config(text="Strength: Weak", foreground="red")
+def update_strength(password, known_entropy=None):
+    result = password_strength.score_password(password, known_entropy=known_entropy)
+    strength_label.config(text=f"Strength: {result.strength} ({result.entropy:.0f} bits)",
+                          foreground=result.color)
+
+def history_view_size():
+    return len(password_history) if history_rows is None else len(history_rows)
+
+def history_entry(view_pos):
+    return password_history[view_pos if history_rows is None else history_rows[view_pos]]
 
-def update_history_list():
+def render_history():
+    # Fill the listbox with the visible slice and sync the scrollbar to the full view
+    global history_top
+    total = history_view_size()
+    history_top = max(0, min(history_top, total - history_visible))
+    end = min(total, history_top + history_visible)
     history_listbox.delete(0, tk.END)
-    for pwd in password_history:
-        history_listbox.insert(tk.END, pwd)
+    if end > history_top:
+        history_listbox.insert(tk.END, *(history_entry(i) for i in range(history_top, end)))
+    update_history_scrollbar()
+
+def update_history_scrollbar():
+    total = history_view_size()
+    if total <= history_visible:
+        history_scroll.set(0, 1)
+    else:
+        history_scroll.set(history_top / total, (history_top + history_visible) / total)
+    history_count_label.config(text=f"{history_view_size():,} of {len(password_history):,}")
+
+def scroll_history(*args):
+    # Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+    global history_top
+    total = history_view_size()
+    if args[0] == "moveto":
+        history_top = int(float(args[1]) * total)
+    elif args[0] == "scroll":
+        step = history_visible if args[2] == "pages" else 1
+        history_top += int(args[1]) * step
+    render_history()
+
+def on_history_wheel(event):
+    delta = event.delta if event.delta else (120 if event.num == 4 else -120)
+    scroll_history("scroll", -1 if delta > 0 else 1, "units")
+    return "break"
+
+def on_history_resize(event):
+    global history_visible
+    line = tkfont.Font(font=history_listbox.cget("font")).metrics("linespace") + 1
+    rows = max(1, event.height // line)
+    if rows != history_visible:
+        history_visible = rows
+        render_history()
+
+def filter_history(*_):
+    global history_rows, history_top
+    text = history_search_var.get()
+    history_rows = password_history.search(text, history_prefix_var.get()) if text else None
+    history_top = 0
+    render_history()
+
+def add_to_history(password):
+    # Incremental update: with no filter and the view at the top, the new row is
+    # inserted and the bottom row dropped; scrolled further down, the view keeps
+    # showing the same rows and only the scrollbar moves
+    global history_top
+    full = len(password_history) == password_history.capacity
+    if not password_history.add(password):
+        return
+    if history_rows is not None:
+        filter_history()
+    elif full:
+        render_history()
+    elif history_top == 0:
+        history_listbox.insert(0, password)
+        if history_listbox.size() > history_visible:
+            history_listbox.delete(history_visible, tk.END)
+        update_history_scrollbar()
+    else:
+        history_top += 1
+        update_history_scrollbar()
 
 def save_password_to_file():
     if not password_var.get():
         messagebox.showwarning("No password", "Generate a password first.")
         return
+    if export_job is not None:
+        messagebox.showwarning("Export running", "Wait for the current export to finish.")
+        return
+    compressed = [(f"{name} compressed", f"*.txt{ext}") for name, ext in password_export.COMPRESSIONS.items()]
     path = filedialog.asksaveasfilename(defaultextension=".txt",
-                                        filetypes=[("Text Files", "*.txt")],
+                                        filetypes=[("Text Files", "*.txt")] + compressed,
                                         title="Save passwords to...")
     if not path:
         return
-    try:
-        with open(path, "a", encoding="utf-8") as f:
-            for p in password_history:
-                f.write(p + "\n")
-        messagebox.showinfo("Saved", f"Passwords saved to {os.path.basename(path)}")
-    except Exception as e:
-        messagebox.showerror("Error", f"Could not save file:\n{e}")
+    passphrase = None
+    if messagebox.askyesno("Encrypt", "Encrypt the file with a passphrase?"):
+        passphrase = simpledialog.askstring("Passphrase", "Passphrase:", show="*", parent=root)
+        if not passphrase:
+            return
+    start_export(path, passphrase)
+
+def start_export(path, passphrase):
+    # The history is copied here (cheap) and written on a background thread
+    global export_job
+    passwords = list(password_history)
+    export_job = password_export.ExportJob(path, passwords, len(passwords),
+                                           password_export.compression_for_path(path), passphrase)
+    export_job.start()
+    save_btn.config(state="disabled")
+    export_progress.config(maximum=max(len(passwords), 1), value=0)
+    root.after(EXPORT_POLL_MS, poll_export)
+
+def poll_export():
+    global export_job
+    job = export_job
+    for event in job.poll():
+        if event[0] in ("done", "error"):
+            export_job = None
+            save_btn.config(state="normal")
+            export_progress.config(value=0)
+            if event[0] == "done":
+                messagebox.showinfo("Saved", f"{event[1]:,} passwords saved to {os.path.basename(job.path)}")
+            else:
+                messagebox.showerror("Error", f"Could not save file:\n{event[1]}")
+            return
+        export_progress.config(value=event[0])
+    root.after(EXPORT_POLL_MS, poll_export)
 
 def copy_to_clipboard():
     pwd = password_var.get()
     if not pwd:
         messagebox.showwarning("No password", "Generate a password first.")
         return
-    pyperclip.copy(pwd)
+    try:
+        import pyperclip  # only needed here, so imported on the first copy
+        pyperclip.copy(pwd)
+    except ImportError:
+        root.clipboard_clear()
+        root.clipboard_append(pwd)
     messagebox.showinfo("Copied", "Password copied to clipboard.")
 
 # ---------- Core Generation ----------
@@ -114,159 +221,165 @@ def generate_password():
         symbols_var.set(True)
     # Custom -> keep user selections
 
-    length = length_var.get()
-    use_upper = upper_var.get()
-    use_lower = lower_var.get()
-    use_digits = digits_var.get()
-    use_symbols = symbols_var.get()
-    avoid_similar = avoid_var.get()
-
-    if not (use_upper or use_lower or use_digits or use_symbols):
-        messagebox.showwarning("Selection Error", "Please select at least one character type.")
+    known_entropy = None
+    try:
+        if passphrase_var.get():
+            # Uppercase capitalizes every word; digits/symbols add one to a random word
+            options = dict(words=words_var.get(), separator=separator_var.get(),
+                           capitalize="words" if upper_var.get() else "none",
+                           digit=digits_var.get(), symbol=symbols_var.get())
+            password = passphrase.generate_passphrase(**options)
+            known_entropy = passphrase.passphrase_entropy(
+                options["words"], len(passphrase.get_wordlist()), options["capitalize"],
+                options["digit"], options["symbol"])
+        else:
+            password = password_engine.generate_password(
+                length_var.get(), upper_var.get(), lower_var.get(),
+                digits_var.get(), symbols_var.get(), avoid_var.get())
+    except ValueError as e:
+        messagebox.showwarning("Selection Error", str(e))
         return
 
-    pool = ""
-    if use_upper:
-        pool += string.ascii_uppercase
-    if use_lower:
-        pool += string.ascii_lowercase
-    if use_digits:
-        pool += string.digits
-    if use_symbols:
-        pool += string.punctuation
-
-    if avoid_similar:
-        pool = "".join([c for c in pool if c not in SIMILAR_CHARS])
-
-    # ensure at least one char from each selected category if possible
-    password_chars = []
-    categories = []
-    if use_upper:
-        categories.append(string.ascii_uppercase)
-    if use_lower:
-        categories.append(string.ascii_lowercase)
-    if use_digits:
-        categories.append(string.digits)
-    if use_symbols:
-        categories.append(string.punctuation)
-
-    # Guarantee coverage if length >= number of categories
-    if length >= len(categories):
-        for cat in categories:
-            filtered = cat
-            if avoid_similar:
-                filtered = "".join([c for c in cat if c not in SIMILAR_CHARS])
-            if filtered:
-                password_chars.append(random.choice(filtered))
-
-    # fill remaining
-    while len(password_chars) < length:
-        password_chars.append(random.choice(pool))
-
-    random.shuffle(password_chars)
-    password = "".join(password_chars[:length])
-
     password_var.set(password)
-    update_strength(password)
+    update_strength(password, known_entropy)
 
-    if password not in password_history:
-        password_history.insert(0, password)
-        if len(password_history) > MAX_HISTORY:
-            password_history.pop()
-        update_history_list()
+    add_to_history(password)
 
 # ---------- UI Building ----------
-root = tk.Tk()
-root.title("Random Password Generator")
-root.geometry("520x520")
-root.resizable(False, False)
-style = ttk.Style(root)
-
-# Top frame: title + output
-top_frame = tk.Frame(root)
-top_frame.pack(fill="x", pady=(12, 6))
-
-title = tk.Label(top_frame, text="Random Password Generator", font=("Segoe UI", 16, "bold"))
-title.pack()
-
-output_entry = tk.Entry(top_frame, textvariable=tk.StringVar(), font=("Consolas", 14), justify="center")
-password_var = output_entry.cget("textvariable")
-password_var = tk.StringVar()
-output_entry.config(textvariable=password_var, width=38)
-output_entry.pack(pady=(8, 2))
-
-strength_label = ttk.Label(top_frame, text="Strength: ", font=("Segoe UI", 11))
-strength_label.pack()
-
-# Middle frame: controls grouped
-controls_frame = tk.Frame(root)
-controls_frame.pack(fill="x", padx=12, pady=8)
-
-# Left subframe: strength + options
-left_frame = tk.LabelFrame(controls_frame, text="Password Options", padx=10, pady=8)
-left_frame.pack(side="left", fill="both", expand=True, padx=(0,8))
-
-# Strength level
-strength_level_var = tk.StringVar(value="Custom")
-tk.Label(left_frame, text="Select Strength Level:").grid(row=0, column=0, sticky="w")
-strength_combo = ttk.Combobox(left_frame, textvariable=strength_level_var,
-                              values=["Weak", "Medium", "Strong", "Custom"], state="readonly", width=10)
-strength_combo.grid(row=1, column=0, sticky="w", pady=(0,8))
-strength_combo.set("Custom")
-
-# Length spinner
-length_var = tk.IntVar(value=12)
-tk.Label(left_frame, text="Password Length:").grid(row=2, column=0, sticky="w")
-length_spin = tk.Spinbox(left_frame, from_=4, to=64, textvariable=length_var, width=6)
-length_spin.grid(row=3, column=0, sticky="w", pady=(0,8))
-
-# Checkboxes (stacked)
-upper_var = tk.BooleanVar(value=True)
-lower_var = tk.BooleanVar(value=True)
-digits_var = tk.BooleanVar(value=True)
-symbols_var = tk.BooleanVar(value=False)
-avoid_var = tk.BooleanVar(value=False)
-
-tk.Checkbutton(left_frame, text="Include Uppercase", variable=upper_var).grid(row=4, column=0, sticky="w")
-tk.Checkbutton(left_frame, text="Include Lowercase", variable=lower_var).grid(row=5, column=0, sticky="w")
-tk.Checkbutton(left_frame, text="Include Digits", variable=digits_var).grid(row=6, column=0, sticky="w")
-tk.Checkbutton(left_frame, text="Include Symbols", variable=symbols_var).grid(row=7, column=0, sticky="w")
-tk.Checkbutton(left_frame, text="Avoid Similar Characters (O/0 l/1)", variable=avoid_var).grid(row=8, column=0, sticky="w")
-
-# Right subframe: theme + buttons
-right_frame = tk.LabelFrame(controls_frame, text="Actions", padx=10, pady=8)
-right_frame.pack(side="right", fill="y")
-
-theme_var = tk.StringVar(value="Light")
-tk.Label(right_frame, text="Select Theme:").pack(anchor="w")
-theme_combo = ttk.Combobox(right_frame, textvariable=theme_var, values=list(THEMES.keys()), state="readonly", width=12)
-theme_combo.pack(pady=(0,8))
-theme_combo.set("Light")
-apply_btn = ttk.Button(right_frame, text="Apply Theme", command=lambda: apply_theme(theme_var.get()))
-apply_btn.pack(fill="x", pady=(0,8))
-
-# Buttons row (Generate, Copy, Save)
-btn_frame = tk.Frame(right_frame)
-btn_frame.pack(fill="x", pady=(6,0))
-gen_btn = ttk.Button(btn_frame, text="Generate", command=generate_password)
-gen_btn.pack(side="left", expand=True, fill="x", padx=(0,4))
-copy_btn = ttk.Button(btn_frame, text="Copy", command=copy_to_clipboard)
-copy_btn.pack(side="left", expand=True, fill="x", padx=4)
-save_btn = ttk.Button(btn_frame, text="Save", command=save_password_to_file)
-save_btn.pack(side="left", expand=True, fill="x", padx=(4,0))
-
-# History frame
-history_frame = tk.LabelFrame(root, text="Password History (last 10)", padx=8, pady=8)
-history_frame.pack(fill="both", expand=True, padx=12, pady=(8,12))
-
-history_listbox = tk.Listbox(history_frame, height=8)
-history_listbox.pack(side="left", fill="both", expand=True)
-history_scroll = ttk.Scrollbar(history_frame, orient="vertical", command=history_listbox.yview)
-history_scroll.pack(side="right", fill="y")
-history_listbox.config(yscrollcommand=history_scroll.set)
-
-# Apply initial theme and generate once
-apply_theme("Light")
-root.after(120, generate_password)
-
-root.mainloop()
+def main():
+    global tk, ttk, messagebox, filedialog, simpledialog, tkfont
+    global root, password_var, strength_label, strength_level_var, length_var, upper_var, lower_var
+    global digits_var, symbols_var, avoid_var, passphrase_var, words_var, separator_var, save_btn
+    global export_progress, history_search_var, history_prefix_var, history_count_label
+    global history_listbox, history_scroll
+    import tkinter as tk
+    from tkinter import ttk, messagebox, filedialog, simpledialog, font as tkfont
+    import tk_instrument
+    tk_instrument.install()
+
+    root = tk.Tk()
+    root.title("Random Password Generator")
+    root.geometry("520x520")
+    root.resizable(False, False)
+    style = ttk.Style(root)
+
+    # Top frame: title + output
+    top_frame = tk.Frame(root)
+    top_frame.pack(fill="x", pady=(12, 6))
+
+    title = tk.Label(top_frame, text="Random Password Generator", font=("Segoe UI", 16, "bold"))
+    title.pack()
+
+    output_entry = tk.Entry(top_frame, textvariable=tk.StringVar(), font=("Consolas", 14), justify="center")
+    password_var = output_entry.cget("textvariable")
+    password_var = tk.StringVar()
+    output_entry.config(textvariable=password_var, width=38)
+    output_entry.pack(pady=(8, 2))
+
+    strength_label = ttk.Label(top_frame, text="Strength: ", font=("Segoe UI", 11))
+    strength_label.pack()
+
+    # Middle frame: controls grouped
+    controls_frame = tk.Frame(root)
+    controls_frame.pack(fill="x", padx=12, pady=8)
+
+    # Left subframe: strength + options
+    left_frame = tk.LabelFrame(controls_frame, text="Password Options", padx=10, pady=8)
+    left_frame.pack(side="left", fill="both", expand=True, padx=(0,8))
+
+    # Strength level
+    strength_level_var = tk.StringVar(value="Custom")
+    tk.Label(left_frame, text="Select Strength Level:").grid(row=0, column=0, sticky="w")
+    strength_combo = ttk.Combobox(left_frame, textvariable=strength_level_var,
+                                  values=["Weak", "Medium", "Strong", "Custom"], state="readonly", width=10)
+    strength_combo.grid(row=1, column=0, sticky="w", pady=(0,8))
+    strength_combo.set("Custom")
+
+    # Length spinner
+    length_var = tk.IntVar(value=12)
+    tk.Label(left_frame, text="Password Length:").grid(row=2, column=0, sticky="w")
+    length_spin = tk.Spinbox(left_frame, from_=4, to=64, textvariable=length_var, width=6)
+    length_spin.grid(row=3, column=0, sticky="w", pady=(0,8))
+
+    # Checkboxes (stacked)
+    upper_var = tk.BooleanVar(value=True)
+    lower_var = tk.BooleanVar(value=True)
+    digits_var = tk.BooleanVar(value=True)
+    symbols_var = tk.BooleanVar(value=False)
+    avoid_var = tk.BooleanVar(value=False)
+
+    tk.Checkbutton(left_frame, text="Include Uppercase", variable=upper_var).grid(row=4, column=0, sticky="w")
+    tk.Checkbutton(left_frame, text="Include Lowercase", variable=lower_var).grid(row=5, column=0, sticky="w")
+    tk.Checkbutton(left_frame, text="Include Digits", variable=digits_var).grid(row=6, column=0, sticky="w")
+    tk.Checkbutton(left_frame, text="Include Symbols", variable=symbols_var).grid(row=7, column=0, sticky="w")
+    tk.Checkbutton(left_frame, text="Avoid Similar Characters (O/0 l/1)", variable=avoid_var).grid(row=8, column=0, sticky="w")
+
+    # Passphrase mode (words from the Diceware list instead of characters)
+    passphrase_var = tk.BooleanVar(value=False)
+    words_var = tk.IntVar(value=6)
+    separator_var = tk.StringVar(value="-")
+    passphrase_frame = tk.Frame(left_frame)
+    passphrase_frame.grid(row=9, column=0, sticky="w", pady=(4,0))
+    tk.Checkbutton(passphrase_frame, text="Passphrase", variable=passphrase_var).pack(side="left")
+    tk.Label(passphrase_frame, text="Words:").pack(side="left")
+    tk.Spinbox(passphrase_frame, from_=3, to=12, textvariable=words_var, width=3).pack(side="left")
+    tk.Label(passphrase_frame, text="Sep:").pack(side="left", padx=(4,0))
+    tk.Entry(passphrase_frame, textvariable=separator_var, width=3).pack(side="left")
+
+    # Right subframe: theme + buttons
+    right_frame = tk.LabelFrame(controls_frame, text="Actions", padx=10, pady=8)
+    right_frame.pack(side="right", fill="y")
+
+    theme_var = tk.StringVar(value="Light")
+    tk.Label(right_frame, text="Select Theme:").pack(anchor="w")
+    theme_combo = ttk.Combobox(right_frame, textvariable=theme_var, values=list(THEMES.keys()), state="readonly", width=12)
+    theme_combo.pack(pady=(0,8))
+    theme_combo.set("Light")
+    apply_btn = ttk.Button(right_frame, text="Apply Theme", command=lambda: apply_theme(theme_var.get()))
+    apply_btn.pack(fill="x", pady=(0,8))
+
+    # Buttons row (Generate, Copy, Save)
+    btn_frame = tk.Frame(right_frame)
+    btn_frame.pack(fill="x", pady=(6,0))
+    gen_btn = ttk.Button(btn_frame, text="Generate", command=generate_password)
+    gen_btn.pack(side="left", expand=True, fill="x", padx=(0,4))
+    copy_btn = ttk.Button(btn_frame, text="Copy", command=copy_to_clipboard)
+    copy_btn.pack(side="left", expand=True, fill="x", padx=4)
+    save_btn = ttk.Button(btn_frame, text="Save", command=save_password_to_file)
+    save_btn.pack(side="left", expand=True, fill="x", padx=(4,0))
+    export_progress = ttk.Progressbar(right_frame, mode="determinate")
+    export_progress.pack(fill="x", pady=(6,0))
+
+    # History frame
+    history_frame = tk.LabelFrame(root, text=f"Password History (last {MAX_HISTORY:,})", padx=8, pady=8)
+    history_frame.pack(fill="both", expand=True, padx=12, pady=(8,12))
+
+    search_frame = tk.Frame(history_frame)
+    search_frame.pack(side="top", fill="x", pady=(0,4))
+    tk.Label(search_frame, text="Search:").pack(side="left")
+    history_search_var = tk.StringVar()
+    history_search_var.trace_add("write", filter_history)
+    tk.Entry(search_frame, textvariable=history_search_var, width=18).pack(side="left", padx=4)
+    history_prefix_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(search_frame, text="Prefix only", variable=history_prefix_var,
+                   command=filter_history).pack(side="left")
+    history_count_label = tk.Label(search_frame, text="0 of 0")
+    history_count_label.pack(side="right")
+
+    history_listbox = tk.Listbox(history_frame, height=history_visible)
+    history_listbox.pack(side="left", fill="both", expand=True)
+    history_scroll = ttk.Scrollbar(history_frame, orient="vertical", command=scroll_history)
+    history_scroll.pack(side="right", fill="y")
+    history_listbox.bind("<Configure>", on_history_resize)
+    for _event in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+        history_listbox.bind(_event, on_history_wheel)
+
+    # Apply initial theme and generate once
+    apply_theme("Light")
+    root.after(120, generate_password)
+
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
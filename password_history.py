@@ -0,0 +1,79 @@
+from bisect import bisect_right
+from itertools import accumulate
+
+MAX_HISTORY = 100_000
+
+
+class PasswordHistory:
+    # Ring buffer of the most recent unique passwords, newest first. A dict maps
+    # each password to its sequence number, so dedup and eviction are O(1); the
+    # slot for sequence number s is s % capacity.
+    def __init__(self, capacity=MAX_HISTORY):
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.index = {}
+        self.next_seq = 0
+        self.version = 0  # bumped on every change; invalidates the search text
+        self._text = None
+        self._starts = None
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, password):
+        return password in self.index
+
+    def __getitem__(self, i):
+        # i = 0 is the newest entry
+        if not 0 <= i < len(self.index):
+            raise IndexError(i)
+        return self.slots[(self.next_seq - 1 - i) % self.capacity]
+
+    def __iter__(self):
+        for i in range(len(self.index)):
+            yield self.slots[(self.next_seq - 1 - i) % self.capacity]
+
+    def add(self, password):
+        # False when the password is already in the history (it keeps its place)
+        if password in self.index:
+            return False
+        slot = self.next_seq % self.capacity
+        evicted = self.slots[slot]
+        if evicted is not None:
+            del self.index[evicted]
+        self.slots[slot] = password
+        self.index[password] = self.next_seq
+        self.next_seq += 1
+        self.version += 1
+        return True
+
+    def clear(self):
+        self.slots = [None] * self.capacity
+        self.index.clear()
+        self.version += 1
+
+    def search(self, text, prefix=False):
+        # Positions (newest first) of entries containing text, or starting with it.
+        # The scan runs over one joined string with str.find, and hits are mapped
+        # back to rows by bisecting the line start offsets.
+        if not text:
+            return list(range(len(self)))
+        if "\n" in text:
+            return []
+        if self._text is None or self._text[0] != self.version:
+            entries = list(self)
+            self._text = (self.version, "\n" + "\n".join(entries) + "\n")
+            self._starts = list(accumulate((len(p) + 1 for p in entries[:-1]), initial=1))
+        joined, starts = self._text[1], self._starts
+        # A prefix match is a hit on "\n" + text, which starts one before the row
+        needle, shift = ("\n" + text, 1) if prefix else (text, 0)
+        matches = []
+        pos = joined.find(needle)
+        while pos >= 0:
+            row = bisect_right(starts, pos + shift) - 1
+            matches.append(row)
+            if row + 1 == len(starts):
+                break
+            # One hit per row is enough: carry on from the next row
+            pos = joined.find(needle, starts[row + 1] - shift)
+        return matches
@@ -0,0 +1,224 @@
+import codecs
+import itertools
+import math
+import string
+from collections import namedtuple
+
+np = None  # bound by iter_score_batch() via password_breach._numpy(); there is a plain-loop fallback
+
+import password_breach
+
+# Character classes, looked up per Latin-1 code; anything outside Latin-1 is
+# folded onto \xff and counts as OTHER
+FOLDED = 0xFF
+LOWER, UPPER, DIGIT, SYMBOL, OTHER = 1, 2, 4, 8, 16
+CLASS_SIZES = {LOWER: 26, UPPER: 26, DIGIT: 10, SYMBOL: 33, OTHER: 100}
+CLASS_NAMES = {LOWER: "lower", UPPER: "upper", DIGIT: "digits", SYMBOL: "symbols", OTHER: "other"}
+
+
+def _char_class(code):
+    c = chr(code)
+    if c in string.ascii_lowercase:
+        return LOWER
+    if c in string.ascii_uppercase:
+        return UPPER
+    if c in string.digits:
+        return DIGIT
+    if c in string.punctuation or c == " ":
+        return SYMBOL
+    return OTHER
+
+
+CLASS_TABLE = bytes(_char_class(code) for code in range(256))
+# Bits per character for every combination of classes present
+POOL_BITS = tuple(
+    math.log2(sum(size for cls, size in CLASS_SIZES.items() if mask & cls) or 1) for mask in range(32)
+)
+
+# Neighbouring keys on a US QWERTY keyboard (either case), as code pairs
+KEYBOARD_ROWS = ("`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./")
+
+
+def _keyboard_pairs():
+    pairs = set()
+    for row in KEYBOARD_ROWS:
+        for a, b in zip(row, row[1:]):
+            for x, y in ((a, b), (a.upper(), b.upper())):
+                pairs.add((ord(x), ord(y)))
+                pairs.add((ord(y), ord(x)))
+    return frozenset(pairs)
+
+
+KEYBOARD_PAIRS = _keyboard_pairs()
+
+# A character that continues a run of three or more repeated, sequential or
+# keyboard-adjacent characters adds this many bits instead of the full pool size
+PATTERN_BITS = 1.0
+
+# Minimum entropy (bits) for each strength, strongest first
+STRENGTHS = ((60, "Strong", "green"), (40, "Medium", "orange"), (0, "Weak", "red"))
+
+StrengthResult = namedtuple("StrengthResult", "entropy strength color length predictable classes patterns")
+
+codecs.register_error("strength_other", lambda e: (chr(FOLDED) * (e.end - e.start), e.end))
+
+
+def _codes(password):
+    return password.encode("latin-1", "strength_other")
+
+
+def strength_for(entropy):
+    for bits, strength, color in STRENGTHS:
+        if entropy >= bits:
+            return strength, color
+    return STRENGTHS[-1][1:]
+
+
+def score_password(password, check_breached=True, known_entropy=None):
+    # One pass over the password: character classes plus runs of repeats
+    # ("aaa"), sequences ("abc", "321") and keyboard walks ("qwer"). A password
+    # in the offline breach index scores zero bits whatever it looks like.
+    # known_entropy caps the estimate when the generator knows better, e.g. a
+    # passphrase is worth its words, not its characters.
+    codes = _codes(password)
+    classes = 0
+    predictable = 0
+    patterns = set()
+    prev = -1
+    prev_rep = prev_seq = prev_walk = prev_marked = False
+    prev_delta = 0
+    for code in codes:
+        classes |= CLASS_TABLE[code]
+        marked = False
+        if prev >= 0:
+            delta = code - prev
+            rep = delta == 0 and code != FOLDED  # folded characters may well differ
+            seq = delta == 1 or delta == -1
+            walk = (prev, code) in KEYBOARD_PAIRS
+            if rep and prev_rep:
+                patterns.add("repeat")
+                marked = True
+            if seq and prev_seq and delta == prev_delta:
+                patterns.add("sequence")
+                marked = True
+            if walk and prev_walk:
+                patterns.add("keyboard")
+                marked = True
+            if marked:
+                # The pattern started a character earlier; count that one too
+                predictable += 1 if prev_marked else 2
+            prev_rep, prev_seq, prev_walk, prev_delta = rep, seq, walk, delta
+        prev_marked = marked
+        prev = code
+
+    length = len(codes)
+    entropy = (length - predictable) * POOL_BITS[classes] + predictable * PATTERN_BITS
+    if known_entropy is not None and known_entropy < entropy:
+        entropy = known_entropy
+        patterns.add("generated")
+    if check_breached and password_breach.is_breached(password):
+        entropy = 0.0
+        patterns.add("breached")
+    strength, color = strength_for(entropy)
+    names = tuple(name for cls, name in CLASS_NAMES.items() if classes & cls)
+    return StrengthResult(entropy, strength, color, length, predictable, names, tuple(sorted(patterns)))
+
+
+# Batch results are arrays: entropy (float), strength (index into STRENGTHS),
+# length and predictable character counts, and the class bitmask per password
+BatchScores = namedtuple("BatchScores", "entropy strength length predictable classes")
+
+# Passwords scored per block of the batch scorer. Only one block of input and its
+# padded byte matrix is held at a time, so iter_score_batch() runs in fixed memory;
+# score_batch() also keeps the result arrays, a few bytes per password
+BATCH_BLOCK = 65_536
+
+_WALK_TABLE = None
+
+
+def _walk_table():
+    global _WALK_TABLE
+    if _WALK_TABLE is None:
+        _WALK_TABLE = np.zeros((256, 256), dtype=bool)
+        pairs = np.array(sorted(KEYBOARD_PAIRS), dtype=np.uint8)
+        _WALK_TABLE[pairs[:, 0], pairs[:, 1]] = True
+    return _WALK_TABLE
+
+
+def _score_block(passwords):
+    encoded = [_codes(p) for p in passwords]
+    lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+    width = max(int(lengths.max()), 1)
+    codes = np.frombuffer(b"".join(e.ljust(width, b"\0") for e in encoded), dtype=np.uint8)
+    codes = codes.reshape(len(encoded), width)
+
+    valid = np.arange(width) < lengths[:, None]
+    class_table = np.frombuffer(CLASS_TABLE, dtype=np.uint8)
+    classes = np.bitwise_or.reduce(np.where(valid, class_table[codes], 0), axis=1).astype(np.uint8)
+
+    predictable = np.zeros(len(encoded), dtype=np.int64)
+    if width >= 3:
+        # Transition t joins characters t and t + 1
+        step_valid = valid[:, 1:]
+        delta = codes[:, 1:].astype(np.int16) - codes[:, :-1]
+        rep = (delta == 0) & (codes[:, 1:] != FOLDED) & step_valid
+        seq = (np.abs(delta) == 1) & step_valid
+        walk = _walk_table()[codes[:, :-1], codes[:, 1:]] & step_valid
+
+        # Two flagged transitions in a row make a three-character pattern; both
+        # characters after the first are predictable
+        runs = ((rep[:, 1:] & rep[:, :-1])
+                | (seq[:, 1:] & seq[:, :-1] & (delta[:, 1:] == delta[:, :-1]))
+                | (walk[:, 1:] & walk[:, :-1]))
+        marked = np.zeros(codes.shape, dtype=bool)
+        marked[:, 1:-1] |= runs
+        marked[:, 2:] |= runs
+        predictable = marked.sum(axis=1)
+
+    entropy = (lengths - predictable) * np.array(POOL_BITS)[classes] + predictable * PATTERN_BITS
+    strength = np.full(len(encoded), len(STRENGTHS) - 1, dtype=np.int8)
+    for index in range(len(STRENGTHS) - 2, -1, -1):
+        strength[entropy >= STRENGTHS[index][0]] = index
+    return BatchScores(entropy, strength, lengths, predictable, classes)
+
+
+def iter_score_batch(passwords, check_breached=True):
+    # Scores any iterable one block at a time, yielding a BatchScores per block;
+    # NumPy lookups over a padded byte matrix, or lists when NumPy is missing
+    global np
+    np = password_breach._numpy()
+    passwords = iter(passwords)
+    while True:
+        block = list(itertools.islice(passwords, BATCH_BLOCK))
+        if not block:
+            return
+        if np is None:
+            results = [score_password(p, check_breached) for p in block]
+            names = [strength for _, strength, _ in STRENGTHS]
+            masks = {name: cls for cls, name in CLASS_NAMES.items()}
+            yield BatchScores(
+                [r.entropy for r in results],
+                [names.index(r.strength) for r in results],
+                [r.length for r in results],
+                [r.predictable for r in results],
+                [sum(masks[name] for name in r.classes) for r in results],
+            )
+            continue
+        scores = _score_block(block)
+        if check_breached and password_breach.get_index() is not None:
+            breached = np.asarray(password_breach.breached_mask(block), dtype=bool)
+            scores.entropy[breached] = 0.0
+            scores.strength[breached] = len(STRENGTHS) - 1
+        yield scores
+
+
+def score_batch(passwords, check_breached=True):
+    # All of iter_score_batch() joined up; gives the same numbers as score_password
+    blocks = list(iter_score_batch(passwords, check_breached))
+    if np is None:
+        columns = zip(*blocks) if blocks else [()] * len(BatchScores._fields)
+        return BatchScores(*(list(itertools.chain.from_iterable(column)) for column in columns))
+    if not blocks:
+        return BatchScores(np.zeros(0), np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.int64),
+                           np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8))
+    return BatchScores(*(np.concatenate(column) for column in zip(*blocks)))
@@ -0,0 +1,106 @@
+import math
+import random
+
+OPTIONS = ['Rock', 'Paper', 'Scissors']
+# Each choice and the choice it beats
+BEATS = {'Rock': 'Scissors', 'Scissors': 'Paper', 'Paper': 'Rock'}
+
+
+def computer_choice(rng=random):
+    return rng.choice(OPTIONS)
+
+
+def round_outcome(user_choice, comp_choice):
+    # "tie", "win" or "lose", from the user's side
+    if user_choice == comp_choice:
+        return "tie"
+    if BEATS[user_choice] == comp_choice:
+        return "win"
+    return "lose"
+
+
+# Probability that the adaptive opponent ignores its model and plays at random
+DIFFICULTIES = {"Easy": 0.6, "Medium": 0.3, "Hard": 0.0}
+
+
+class AdaptiveOpponent:
+    # Predicts the player's next move with n-gram models of orders 0..max_order
+    # over the round history, where each round is one of 9 symbols (player move x
+    # outcome). Each order keeps a fixed table of next-move counts per context and
+    # the orders are mixed with weights that follow how well each one has been
+    # predicting (multiplicative weights on 1 - p(actual move)). Every call does
+    # O(max_order) work and memory is 3 * 9**max_order counts, however long the game.
+    SYMBOLS = 9
+    COUNT_CAP = 64  # a row is halved when it reaches this, so old habits fade
+    LEARNING_RATE = 2.0
+    MIN_WEIGHT = 1e-3
+
+    def __init__(self, difficulty="Medium", max_order=4, rng=random):
+        self.blunder = DIFFICULTIES[difficulty]
+        self.max_order = max_order
+        self.rng = rng
+        self.counts = [[0] * (3 * self.SYMBOLS ** k) for k in range(max_order + 1)]
+        self.weights = [1.0] * (max_order + 1)
+        self.context = 0  # last max_order symbols, base 9, newest lowest
+        self.rounds = 0
+        self.predictions = None
+
+    def _predict_order(self, k):
+        if k > self.rounds:
+            return None
+        row = 3 * (self.context % self.SYMBOLS ** k)
+        counts = self.counts[k]
+        total = counts[row] + counts[row + 1] + counts[row + 2]
+        if not total:
+            return None
+        return [(counts[row + m] + 0.5) / (total + 1.5) for m in range(3)]
+
+    def predict(self):
+        # Probability of the player choosing each of OPTIONS next
+        self.predictions = [self._predict_order(k) for k in range(self.max_order + 1)]
+        mixed = [0.0, 0.0, 0.0]
+        total = 0.0
+        for weight, p in zip(self.weights, self.predictions):
+            if p is not None:
+                for m in range(3):
+                    mixed[m] += weight * p[m]
+                total += weight
+        if not total:
+            return [1 / 3] * 3
+        return [x / total for x in mixed]
+
+    def choose(self):
+        p = self.predict()
+        if self.blunder and self.rng.random() < self.blunder:
+            return self.rng.choice(OPTIONS)
+        # Move m beats move (m - 1) % 3 and loses to (m + 1) % 3
+        expected = [p[(m - 1) % 3] - p[(m + 1) % 3] for m in range(3)]
+        best = max(expected)
+        return self.rng.choice([OPTIONS[m] for m in range(3) if expected[m] == best])
+
+    def observe(self, user_choice, comp_choice):
+        move = OPTIONS.index(user_choice)
+        if self.predictions is None:
+            self.predict()
+        # Reweight the orders by how much probability they gave the actual move
+        weights = self.weights
+        for k, p in enumerate(self.predictions):
+            if p is not None:
+                weights[k] = max(weights[k] * math.exp(-self.LEARNING_RATE * (1 - p[move])), self.MIN_WEIGHT)
+        top = max(weights)
+        for k in range(len(weights)):
+            weights[k] /= top
+        self.predictions = None
+
+        for k in range(min(self.rounds, self.max_order) + 1):
+            row = 3 * (self.context % self.SYMBOLS ** k)
+            counts = self.counts[k]
+            counts[row + move] += 1
+            if counts[row + move] >= self.COUNT_CAP:
+                for m in range(3):
+                    counts[row + m] //= 2
+
+        outcome = ("tie", "win", "lose").index(round_outcome(user_choice, comp_choice))
+        symbol = move * 3 + outcome
+        self.context = (self.context * self.SYMBOLS + symbol) % self.SYMBOLS ** self.max_order
+        self.rounds += 1
@@ -1,10 +1,22 @@
-import tkinter as tk
-import random
+import rps_engine
+from score_store import RPSStore
+
+RPS_SCORE_FILE = "rps_scores.db"
+
+# tkinter is imported by main(), so rps_engine users and headless tools that
+# import this module need no display
+tk = messagebox = None
 
 # Initialize scores and player name
 user_score = 0
 comp_score = 0
 player_name = "Player"
+# The computer learns the player's habits over the session
+difficulty = "Medium"
+opponent = rps_engine.AdaptiveOpponent(difficulty)
+# Every round is kept in the store; a session lasts until Reset or closing the window
+store = None
+session = None
 
 # Themes
 themes = {
@@ -17,17 +29,15 @@ current_theme = "Classic Light"
 # Game logic
 def determine_winner(user_choice):
     global user_score, comp_score
-    options = ['Rock', 'Paper', 'Scissors']
-    comp_choice = random.choice(options)
+    comp_choice = opponent.choose()
+    outcome = rps_engine.round_outcome(user_choice, comp_choice)
+    opponent.observe(user_choice, comp_choice)
+    store.record_round(session, user_choice, comp_choice, outcome)
 
-    if user_choice == comp_choice:
+    if outcome == "tie":
         result = f"It's a tie! You both chose {user_choice}."
         result_label.config(fg="orange")
-    elif (
-        (user_choice == 'Rock' and comp_choice == 'Scissors') or
-        (user_choice == 'Scissors' and comp_choice == 'Paper') or
-        (user_choice == 'Paper' and comp_choice == 'Rock')
-    ):
+    elif outcome == "win":
         result = f"You win! {user_choice} beats {comp_choice}."
         user_score += 1
         result_label.config(fg="lightgreen")
@@ -38,14 +48,28 @@ def determine_winner(user_choice):
 
     result_label.config(text=result)
     score_label.config(text=f"Score — {player_name}: {user_score}  Computer: {comp_score}")
+    update_totals_label()
     play_again_btn.config(state="normal")
 
+def update_totals_label():
+    totals = store.player_totals(player_name)
+    totals_label.config(text=f"All time — {totals['wins']} W  {totals['losses']} L  {totals['ties']} T "
+                             f"over {totals['sessions']} sessions")
+
+def new_session():
+    global session
+    if session is not None:
+        store.end_session(session)
+    session = store.start_session(player_name, difficulty)
+
 # Reset scores
 def reset_game():
     global user_score, comp_score
     user_score = 0
     comp_score = 0
+    new_session()
     score_label.config(text=f"Score — {player_name}: 0  Computer: 0")
+    update_totals_label()
     result_label.config(text="Make your move!", fg=themes[current_theme]["fg"])
     play_again_btn.config(state="disabled")
 
@@ -54,6 +78,30 @@ def play_again():
     result_label.config(text="Make your move!", fg=themes[current_theme]["fg"])
     play_again_btn.config(state="disabled")
 
+# Change difficulty (starts a fresh model of the player)
+def change_difficulty(level):
+    global difficulty, opponent
+    difficulty = level
+    opponent = rps_engine.AdaptiveOpponent(level)
+    difficulty_menu.config(text=f"Difficulty: {level}")
+    reset_game()
+
+# Show the top players by net score (wins - losses)
+def show_leaderboard():
+    rows = store.leaderboard(10)
+    if not rows:
+        messagebox.showinfo("Leaderboard", "No rounds played yet.")
+        return
+    lines = [f"{i}. {name}: {net:+d}  ({wins} W / {losses} L / {ties} T)"
+             for i, (name, rounds, wins, losses, ties, net) in enumerate(rows, 1)]
+    messagebox.showinfo("Leaderboard", "\n".join(lines))
+
+def close_game():
+    if session is not None:
+        store.end_session(session)
+    store.close()
+    game_window.destroy()
+
 # Change theme
 def change_theme(theme_name):
     global current_theme
@@ -68,6 +116,9 @@ def change_theme(theme_name):
     for btn in game_buttons:
         btn.config(bg=theme["btn_bg"], fg=theme["btn_fg"])
     theme_menu.config(bg=theme["btn_bg"], fg=theme["btn_fg"])
+    totals_label.config(bg=theme["bg"], fg=theme["fg"])
+    leaderboard_btn.config(bg=theme["btn_bg"], fg=theme["btn_fg"])
+    difficulty_menu.config(bg=theme["btn_bg"], fg=theme["btn_fg"])
 
 # Start Game
 def start_game():
@@ -81,10 +132,11 @@ def start_game():
 # Launch Game Window
 def launch_game_window():
     global game_window, title_label, score_label, result_label, reset_btn, play_again_btn, game_buttons, theme_menu
+    global difficulty_menu, totals_label, leaderboard_btn, store
 
     game_window = tk.Tk()
     game_window.title("Rock Paper Scissors")
-    game_window.geometry("450x420")
+    game_window.geometry("450x560")
     game_window.resizable(False, False)
 
     # Title
@@ -95,13 +147,20 @@ def launch_game_window():
     # Score display
     score_label = tk.Label(game_window, text=f"Score — {player_name}: 0  Computer: 0",
                            font=("Helvetica", 14))
-    score_label.pack(pady=(0, 10))
+    score_label.pack(pady=(0, 2))
+
+    # All-time totals from the store (only this player's summary row is read)
+    store = RPSStore(RPS_SCORE_FILE)
+    totals_label = tk.Label(game_window, font=("Helvetica", 10))
+    totals_label.pack(pady=(0, 8))
+    new_session()
+    update_totals_label()
 
     # Buttons for choices
     frame = tk.Frame(game_window)
     frame.pack(pady=10)
     game_buttons = []
-    for choice in ['Rock', 'Paper', 'Scissors']:
+    for choice in rps_engine.OPTIONS:
         btn = tk.Button(frame, text=choice, width=10, height=2, font=("Helvetica", 12, "bold"),
                         relief="raised", bd=3, command=lambda c=choice: determine_winner(c))
         btn.pack(side='left', padx=5)
@@ -121,6 +180,11 @@ def launch_game_window():
                           font=("Helvetica", 12, "bold"), relief="ridge", bd=3)
     reset_btn.pack(pady=5)
 
+    # Leaderboard button
+    leaderboard_btn = tk.Button(game_window, text="Leaderboard", command=show_leaderboard,
+                                font=("Helvetica", 12, "bold"), relief="ridge", bd=3)
+    leaderboard_btn.pack(pady=5)
+
     # Theme selection menu
     theme_menu = tk.Menubutton(game_window, text="Change Theme", relief="raised", bd=3,
                                 font=("Helvetica", 12))
@@ -130,20 +194,41 @@ def launch_game_window():
     theme_menu.config(menu=theme_dropdown)
     theme_menu.pack(pady=5)
 
+    # Difficulty selection menu
+    difficulty_menu = tk.Menubutton(game_window, text=f"Difficulty: {difficulty}", relief="raised", bd=3,
+                                    font=("Helvetica", 12))
+    difficulty_dropdown = tk.Menu(difficulty_menu, tearoff=0)
+    for level in rps_engine.DIFFICULTIES:
+        difficulty_dropdown.add_command(label=level, command=lambda l=level: change_difficulty(l))
+    difficulty_menu.config(menu=difficulty_dropdown)
+    difficulty_menu.pack(pady=5)
+
     change_theme(current_theme)
+    game_window.protocol("WM_DELETE_WINDOW", close_game)
     game_window.mainloop()
 
 # Intro Screen
-intro_window = tk.Tk()
-intro_window.title("Rock Paper Scissors - Welcome")
-intro_window.geometry("400x250")
-intro_window.resizable(False, False)
+def main():
+    global tk, messagebox, intro_window, name_entry
+    import tkinter as tk
+    from tkinter import messagebox
+    import tk_instrument
+    tk_instrument.install()
+
+    intro_window = tk.Tk()
+    intro_window.title("Rock Paper Scissors - Welcome")
+    intro_window.geometry("400x250")
+    intro_window.resizable(False, False)
+
+    tk.Label(intro_window, text="Welcome to Rock, Paper, Scissors!", font=("Helvetica", 16, "bold")).pack(pady=10)
+    tk.Label(intro_window, text="Enter your name:", font=("Helvetica", 12)).pack(pady=5)
+    name_entry = tk.Entry(intro_window, font=("Helvetica", 12))
+    name_entry.pack(pady=5)
+
+    tk.Button(intro_window, text="Start Game", font=("Helvetica", 12, "bold"), command=start_game).pack(pady=20)
 
-tk.Label(intro_window, text="Welcome to Rock, Paper, Scissors!", font=("Helvetica", 16, "bold")).pack(pady=10)
-tk.Label(intro_window, text="Enter your name:", font=("Helvetica", 12)).pack(pady=5)
-name_entry = tk.Entry(intro_window, font=("Helvetica", 12))
-name_entry.pack(pady=5)
+    intro_window.mainloop()
 
-tk.Button(intro_window, text="Start Game", font=("Helvetica", 12, "bold"), command=start_game).pack(pady=20)
 
-intro_window.mainloop()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import json
+import math
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # the simulator is NumPy only
+    np = None
+
+from rps_engine import OPTIONS
+
+# Moves are small ints in OPTIONS order (0 Rock, 1 Paper, 2 Scissors), so
+# (a - b) % 3 is 0 for a tie, 1 when a wins and 2 when b wins
+ROCK, PAPER, SCISSORS = range(3)
+RESULT = (0, 1, -1)  # indexed by (a - b) % 3: +1 a wins, -1 b wins
+
+# Matches simulated side by side per NumPy step; bigger runs go in batches of this
+BATCH_GAMES = 65_536
+Z_95 = 1.96
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The RPS simulator needs NumPy: pip install numpy")
+
+
+class Strategy:
+    # Plays many independent matches at once. reset() starts `games` matches,
+    # move() returns one int8 move per match and update() sees both sides' moves.
+    def reset(self, games, rng):
+        self.games = games
+        self.rng = rng
+
+    def move(self):
+        raise NotImplementedError
+
+    def update(self, own, other):
+        pass
+
+
+class RandomStrategy(Strategy):
+    def move(self):
+        return self.rng.integers(0, 3, self.games, dtype=np.int8)
+
+
+class BiasedStrategy(Strategy):
+    def __init__(self, rock=1.0, paper=1.0, scissors=1.0):
+        total = rock + paper + scissors
+        if min(rock, paper, scissors) < 0 or not total:
+            raise ValueError("Biased weights must be non-negative and not all zero")
+        self.p = np.array([rock, paper, scissors]) / total
+
+    def move(self):
+        return self.rng.choice(3, self.games, p=self.p).astype(np.int8)
+
+
+class ConstantStrategy(Strategy):
+    def __init__(self, choice="rock"):
+        self.choice = _parse_move(choice)
+
+    def move(self):
+        return np.full(self.games, self.choice, dtype=np.int8)
+
+
+class CycleStrategy(Strategy):
+    # Rock, Paper, Scissors, ... (step -1 goes the other way), from a random start
+    def __init__(self, step=1):
+        self.step = int(step)
+
+    def reset(self, games, rng):
+        super().reset(games, rng)
+        self.next = rng.integers(0, 3, games, dtype=np.int8)
+
+    def move(self):
+        return self.next
+
+    def update(self, own, other):
+        self.next = (own + self.step) % 3
+
+
+class ReactiveStrategy(Strategy):
+    # Random first move, then a function of the previous round
+    def reset(self, games, rng):
+        super().reset(games, rng)
+        self.next = rng.integers(0, 3, games, dtype=np.int8)
+
+    def move(self):
+        return self.next
+
+
+class CopyStrategy(ReactiveStrategy):
+    # Plays whatever the opponent played last
+    def update(self, own, other):
+        self.next = other
+
+
+class BeatLastStrategy(ReactiveStrategy):
+    # Plays what would have beaten the opponent's last move
+    def update(self, own, other):
+        self.next = (other + 1) % 3
+
+
+class WinStayLoseShiftStrategy(ReactiveStrategy):
+    # Repeats a winning move, otherwise moves on to the next one
+    def update(self, own, other):
+        self.next = np.where((own - other) % 3 == 1, own, (own + 1) % 3).astype(np.int8)
+
+
+class FrequencyStrategy(Strategy):
+    # Beats the opponent's most frequent move so far (ties broken at random)
+    def reset(self, games, rng):
+        super().reset(games, rng)
+        self.counts = np.zeros((games, 3), dtype=np.int32)
+
+    def move(self):
+        noise = self.rng.random((self.games, 3))
+        top = self.counts == self.counts.max(axis=1, keepdims=True)
+        return ((np.argmax(top + noise, axis=1) + 1) % 3).astype(np.int8)
+
+    def update(self, own, other):
+        self.counts[np.arange(self.games), other] += 1
+
+
+STRATEGIES = {
+    "random": RandomStrategy,
+    "biased": BiasedStrategy,
+    "constant": ConstantStrategy,
+    "cycle": CycleStrategy,
+    "copy": CopyStrategy,
+    "beat-last": BeatLastStrategy,
+    "wsls": WinStayLoseShiftStrategy,
+    "frequency": FrequencyStrategy,
+}
+STRATEGY_HELP = ("random, biased:R,P,S (weights), constant:MOVE, cycle[:STEP], "
+                 "copy, beat-last, wsls, frequency")
+
+
+def _parse_move(text):
+    names = [o.lower() for o in OPTIONS]
+    if str(text).lower() in names:
+        return names.index(str(text).lower())
+    raise ValueError(f"Unknown move: {text}")
+
+
+def make_strategy(spec):
+    # "name" or "name:arg,arg"; numeric arguments are passed as floats
+    name, _, args = spec.partition(":")
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {spec} (use {STRATEGY_HELP})")
+    values = []
+    for arg in filter(None, args.split(",")):
+        try:
+            values.append(float(arg))
+        except ValueError:
+            values.append(arg)
+    try:
+        return STRATEGIES[name](*values)
+    except TypeError:
+        raise ValueError(f"Bad arguments for {name}: {args}") from None
+
+
+def _interval(total, total_sq, n):
+    # Mean and 95% half-width over n independent per-match rates
+    mean = total / n
+    if n < 2:
+        return mean, float("nan")
+    var = max(total_sq / n - mean * mean, 0.0) * n / (n - 1)
+    return mean, Z_95 * math.sqrt(var / n)
+
+
+def simulate(spec_a, spec_b, games=10_000, rounds=100, seed=0, batch_games=BATCH_GAMES):
+    # `games` independent matches of `rounds` rounds each. Win/tie/loss rates are
+    # averaged per match and the confidence intervals come from the spread
+    # between matches, which stays valid for strategies that react to history.
+    _require_numpy()
+    if games < 1 or rounds < 1:
+        raise ValueError("games and rounds must be at least 1")
+    a, b = make_strategy(spec_a), make_strategy(spec_b)
+    result = np.array(RESULT, dtype=np.int8)
+    rng = np.random.default_rng(seed)
+    sums = {key: [0.0, 0.0] for key in ("win", "tie", "loss")}
+    start = time.perf_counter()
+    for first in range(0, games, batch_games):
+        n = min(batch_games, games - first)
+        a.reset(n, rng)
+        b.reset(n, rng)
+        wins = np.zeros(n, dtype=np.int32)
+        losses = np.zeros(n, dtype=np.int32)
+        for _ in range(rounds):
+            move_a, move_b = a.move(), b.move()
+            outcome = result[(move_a - move_b) % 3]
+            wins += outcome == 1
+            losses += outcome == -1
+            a.update(move_a, move_b)
+            b.update(move_b, move_a)
+        for key, counts in (("win", wins), ("tie", rounds - wins - losses), ("loss", losses)):
+            rates = counts / rounds
+            sums[key][0] += rates.sum()
+            sums[key][1] += (rates * rates).sum()
+    seconds = time.perf_counter() - start
+
+    rates = {}
+    for key, (total, total_sq) in sums.items():
+        mean, half = _interval(total, total_sq, games)
+        rates[key] = {"rate": mean, "ci95": [mean - half, mean + half]}
+    return {
+        "player_a": spec_a,
+        "player_b": spec_b,
+        "games": games,
+        "rounds": rounds,
+        "seed": seed,
+        "rates": rates,
+        "seconds": seconds,
+        "rounds_per_second": games * rounds / seconds if seconds else 0.0,
+    }
+
+
+def print_report(report):
+    print(f"{report['player_a']} (A) vs {report['player_b']} (B), {report['games']:,} matches "
+          f"of {report['rounds']:,} rounds, seed {report['seed']}")
+    for key in ("win", "tie", "loss"):
+        r = report["rates"][key]
+        low, high = r["ci95"]
+        print(f"A {key:4s} {r['rate']:.2%}  (95% CI {low:.2%} .. {high:.2%})")
+    print(f"{report['rounds_per_second']:,.0f} rounds/s ({report['seconds']:.2f}s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate Rock Paper Scissors strategies against each other")
+    parser.add_argument("player_a", help=f"strategy A: {STRATEGY_HELP}")
+    parser.add_argument("player_b", help="strategy B")
+    parser.add_argument("--games", type=int, default=10_000, help="independent matches")
+    parser.add_argument("--rounds", type=int, default=100, help="rounds per match")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="also write the report to PATH as JSON")
+    args = parser.parse_args(argv)
+    try:
+        report = simulate(args.player_a, args.player_b, args.games, args.rounds, args.seed)
+    except (ValueError, ImportError) as e:
+        sys.exit(str(e))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+import itertools
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+
+# Pending writes are committed together once this many are queued or this many
+# seconds have passed, so one transaction (and at most one fsync) covers a batch
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.5
+
+_CLOSE = object()
+
+# Game result -> matchups column bumped
+OUTCOMES = {"X": "x_wins", "O": "o_wins", "D": "draws"}
+
+
+class SQLiteStore:
+    # SQLite database in WAL mode with a single background writer thread.
+    # Subclasses provide SCHEMA and an apply_<op>(conn, *args) method per write.
+    SCHEMA = ""
+
+    def __init__(self, path):
+        self.path = path
+        self.reader = self.connect()
+        self.reader.executescript(self.SCHEMA)
+        self.reader.commit()
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, name=f"{type(self).__name__} writer",
+                                       daemon=True)
+        self.writer.start()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def submit(self, op, *args):
+        self.queue.put((op, args))
+
+    def _write_loop(self):
+        conn = self.connect()
+        closing = False
+        while not closing:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while batch[-1] is not _CLOSE and len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if batch[-1] is _CLOSE:
+                closing = True
+            writes = [item for item in batch if item is not _CLOSE]
+            try:
+                with conn:
+                    for op, args in writes:
+                        getattr(self, "apply_" + op)(conn, *args)
+            except Exception:
+                # Keep the writer alive whatever happens; the failed batch is rolled back
+                traceback.print_exc()
+                self.rolled_back()
+            else:
+                self.committed()
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+        conn.close()
+
+    def committed(self):
+        # Called on the writer thread once a batch is committed (or rolled back),
+        # so state kept by apply_ methods only outlives batches that reached disk
+        pass
+
+    def rolled_back(self):
+        pass
+
+    def flush(self):
+        # Block until everything submitted so far is committed
+        self.queue.join()
+
+    def close(self):
+        if self.writer.is_alive():
+            self.queue.put(_CLOSE)
+            self.writer.join()
+        self.reader.close()
+
+
+class ScoreStore(SQLiteStore):
+    # Finished TicTacToe games plus the running scoreboard of every pairing
+    # (player X, player O, mode). Only the pairing on screen is read at startup,
+    # never the game log.
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS games (
+            id INTEGER PRIMARY KEY,
+            played_at REAL NOT NULL,
+            mode TEXT NOT NULL,
+            variant TEXT NOT NULL,
+            player_x TEXT NOT NULL,
+            player_o TEXT NOT NULL,
+            result TEXT NOT NULL,
+            moves INTEGER NOT NULL,
+            seconds INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS matchups (
+            player_x TEXT NOT NULL,
+            player_o TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            x_wins INTEGER NOT NULL DEFAULT 0,
+            o_wins INTEGER NOT NULL DEFAULT 0,
+            draws INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (player_x, player_o, mode)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.cache = {}
+
+    def scores(self, player_x, player_o, mode):
+        # Scoreboard for one pairing as {"X": wins, "O": wins, "D": draws}
+        key = (player_x, player_o, mode)
+        if key not in self.cache:
+            row = self.reader.execute(
+                "SELECT x_wins, o_wins, draws FROM matchups WHERE player_x = ? AND player_o = ? AND mode = ?", key
+            ).fetchone()
+            self.cache[key] = dict(zip(OUTCOMES, row or (0, 0, 0)))
+        return self.cache[key]
+
+    def record_game(self, mode, player_x, player_o, result, moves=0, seconds=0, variant="3x3"):
+        # result is "X", "O" or "D"; the scoreboard is updated in memory straight
+        # away and written with the game row on the next batch
+        self.scores(player_x, player_o, mode)[result] += 1
+        self.submit("game", time.time(), mode, variant, player_x, player_o, result, moves, seconds)
+
+    def reset(self, player_x, player_o, mode):
+        # Clears this pairing's scoreboard only; the game log is kept
+        self.cache[(player_x, player_o, mode)] = dict.fromkeys(OUTCOMES, 0)
+        self.submit("reset", player_x, player_o, mode)
+
+    def apply_game(self, conn, played_at, mode, variant, player_x, player_o, result, moves, seconds):
+        conn.execute(
+            "INSERT INTO games (played_at, mode, variant, player_x, player_o, result, moves, seconds) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (played_at, mode, variant, player_x, player_o, result, moves, seconds),
+        )
+        column = OUTCOMES[result]
+        conn.execute(
+            f"INSERT INTO matchups (player_x, player_o, mode, {column}) VALUES (?, ?, ?, 1) "
+            f"ON CONFLICT (player_x, player_o, mode) DO UPDATE SET {column} = {column} + 1",
+            (player_x, player_o, mode),
+        )
+
+    def apply_reset(self, conn, player_x, player_o, mode):
+        conn.execute("DELETE FROM matchups WHERE player_x = ? AND player_o = ? AND mode = ?",
+                     (player_x, player_o, mode))
+
+
+# RPS round outcome (player's side) -> column bumped and the value stored per round
+RPS_OUTCOMES = {"win": ("wins", 1), "lose": ("losses", -1), "tie": ("ties", 0)}
+RPS_MOVES = ("Rock", "Paper", "Scissors")
+
+
+class RPSStore(SQLiteStore):
+    # Rock Paper Scissors sessions and their rounds, plus per-player aggregates
+    # kept up to date with every round. Rounds are keyed by (session, number)
+    # and never read back by the GUI; the leaderboard only touches the small
+    # aggregate table through its indexes.
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rps_sessions (
+            id INTEGER PRIMARY KEY,
+            player TEXT NOT NULL,
+            difficulty TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            ended_at REAL,
+            rounds INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0,
+            ties INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS rps_rounds (
+            session_id INTEGER NOT NULL,
+            number INTEGER NOT NULL,
+            played_at REAL NOT NULL,
+            user_move INTEGER NOT NULL,
+            comp_move INTEGER NOT NULL,
+            outcome INTEGER NOT NULL,
+            PRIMARY KEY (session_id, number)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS rps_players (
+            player TEXT PRIMARY KEY,
+            sessions INTEGER NOT NULL DEFAULT 0,
+            rounds INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0,
+            ties INTEGER NOT NULL DEFAULT 0,
+            net INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS rps_players_by_net ON rps_players (net DESC, wins DESC);
+        CREATE INDEX IF NOT EXISTS rps_players_by_wins ON rps_players (wins DESC, net DESC);
+        CREATE INDEX IF NOT EXISTS rps_sessions_by_player ON rps_sessions (player, started_at);
+    """
+    AGGREGATES = ("sessions", "rounds", "wins", "losses", "ties", "net")
+    LEADERBOARD_ORDER = {"net": "net DESC, wins DESC", "wins": "wins DESC, net DESC"}
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.cache = {}
+        # Sessions are known by a handle from this process so rounds can be queued
+        # before the session row exists; SQLite picks the row id when the writer
+        # inserts it, so several processes can share one database. Ids from the
+        # batch in progress are staged and kept only if it commits, because
+        # SQLite hands a rolled back id out again (writer thread only).
+        self.handles = itertools.count(1)
+        self.session_ids = {}  # handle -> rps_sessions.id of committed sessions
+        self.staged_ids = {}
+        self.ended = []
+        self.round_numbers = {}
+
+    def player_totals(self, player):
+        if player not in self.cache:
+            row = self.reader.execute(
+                f"SELECT {', '.join(self.AGGREGATES)} FROM rps_players WHERE player = ?", (player,)
+            ).fetchone()
+            self.cache[player] = dict(zip(self.AGGREGATES, row or (0,) * len(self.AGGREGATES)))
+        return self.cache[player]
+
+    def start_session(self, player, difficulty):
+        session = next(self.handles)
+        self.round_numbers[session] = (player, 0)
+        self.player_totals(player)["sessions"] += 1
+        self.submit("rps_session", session, player, difficulty, time.time())
+        return session
+
+    def record_round(self, session, user_move, comp_move, outcome):
+        # outcome is "win", "lose" or "tie" from the player's side
+        player, number = self.round_numbers[session]
+        self.round_numbers[session] = (player, number + 1)
+        column, value = RPS_OUTCOMES[outcome]
+        totals = self.player_totals(player)
+        totals["rounds"] += 1
+        totals[column] += 1
+        totals["net"] += value
+        self.submit("rps_round", session, player, number, time.time(),
+                    RPS_MOVES.index(user_move), RPS_MOVES.index(comp_move), outcome)
+
+    def end_session(self, session):
+        self.round_numbers.pop(session, None)
+        self.submit("rps_end", session, time.time())
+
+    def leaderboard(self, limit=10, order="net"):
+        # Top players as (player, rounds, wins, losses, ties, net). Players this
+        # process has loaded are taken from the in-memory totals, which already
+        # include rounds still queued for the writer, so nothing waits on a commit.
+        rows = self.reader.execute(
+            f"SELECT player, rounds, wins, losses, ties, net FROM rps_players "
+            f"ORDER BY {self.LEADERBOARD_ORDER[order]} LIMIT ?", (limit + len(self.cache),)
+        ).fetchall()
+        players = {row[0]: row for row in rows}
+        for player, totals in self.cache.items():
+            if totals["sessions"] or totals["rounds"]:
+                players[player] = (player,) + tuple(totals[key] for key in self.AGGREGATES[1:])
+        first, second = (5, 2) if order == "net" else (2, 5)
+        ranked = sorted(players.values(), key=lambda row: (-row[first], -row[second]))
+        return ranked[:limit]
+
+    def apply_rps_session(self, conn, session, player, difficulty, started_at):
+        cursor = conn.execute("INSERT INTO rps_sessions (player, difficulty, started_at) VALUES (?, ?, ?)",
+                              (player, difficulty, started_at))
+        self.staged_ids[session] = cursor.lastrowid
+        conn.execute("INSERT INTO rps_players (player, sessions) VALUES (?, 1) "
+                     "ON CONFLICT (player) DO UPDATE SET sessions = sessions + 1", (player,))
+
+    def apply_rps_round(self, conn, session, player, number, played_at, user_move, comp_move, outcome):
+        column, value = RPS_OUTCOMES[outcome]
+        session = self._session_id(session)
+        if session is None:
+            return
+        conn.execute("INSERT INTO rps_rounds VALUES (?, ?, ?, ?, ?, ?)",
+                     (session, number, played_at, user_move, comp_move, value))
+        conn.execute(f"UPDATE rps_sessions SET rounds = rounds + 1, {column} = {column} + 1 WHERE id = ?",
+                     (session,))
+        conn.execute(f"UPDATE rps_players SET rounds = rounds + 1, {column} = {column} + 1, "
+                     f"net = net + ? WHERE player = ?", (value, player))
+
+    def apply_rps_end(self, conn, session, ended_at):
+        self.ended.append(session)
+        session = self._session_id(session)
+        if session is not None:
+            conn.execute("UPDATE rps_sessions SET ended_at = ? WHERE id = ?", (ended_at, session))
+
+    def _session_id(self, session):
+        # None when the session row was lost with a failed batch; its rounds are
+        # dropped rather than written under an id SQLite may reuse
+        session_id = self.staged_ids.get(session, self.session_ids.get(session))
+        if session_id is None:
+            print(f"RPSStore: session {session} was not saved, dropping its update", file=sys.stderr)
+        return session_id
+
+    def committed(self):
+        self.session_ids.update(self.staged_ids)
+        for session in self.ended:
+            self.session_ids.pop(session, None)
+        self.rolled_back()
+
+    def rolled_back(self):
+        self.staged_ids.clear()
+        self.ended.clear()
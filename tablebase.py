@@ -0,0 +1,411 @@
+import argparse
+import mmap
+import os
+import random
+import shutil
+import struct
+import sys
+import time
+from functools import lru_cache
+
+np = None  # bound by _require_numpy(); probing works without it, building needs it
+
+from mnk_engine import VARIANTS, X, O, MNKBoard, Searcher, _geometry
+
+# Precomputed answers for the boards beyond 3x3, built offline with
+#   python tablebase.py build 4x4
+# Boards of up to EXACT_MAX_CELLS cells are solved completely by retrograde
+# analysis, one layer (stone count) at a time from the full board back to the
+# empty one. Larger boards get an opening book: every position with fewer than
+# BOOK_STONES stones, answered by a fixed-depth search.
+TABLEBASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebases")
+FILE_MAGIC = b"TTTB\x01"
+HEADER = struct.Struct("<5sBBBBQ")  # magic, rows, cols, k, exact (1) or book (0), record count
+RECORD = struct.Struct("<QbI")  # canonical key (x | o << cells), value, best-move mask
+EXACT_MAX_CELLS = 16
+BOOK_STONES = 3
+BOOK_DEPTH = 3
+# Positions per pool task; finished chunks are kept on disk, so an interrupted
+# build picks up from the last one written
+CHUNK_SIZE = 50_000
+# Boards the builder handles, by their size ("4x4"): keys need 2 bits per cell
+BUILDABLE = {name.split()[0]: dims for name, dims in VARIANTS.items() if 9 < dims[0] * dims[1] <= 32}
+
+
+def tablebase_path(rows, cols, k, directory=TABLEBASE_DIR):
+    return os.path.join(directory, f"{rows}x{cols}k{k}.tb")
+
+
+@lru_cache(maxsize=None)
+def symmetries(rows, cols):
+    # perms[s][i] is where cell i lands under symmetry s: 8 on a square board, 4 otherwise
+    maps = [lambda r, c: (r, c), lambda r, c: (r, cols - 1 - c),
+            lambda r, c: (rows - 1 - r, c), lambda r, c: (rows - 1 - r, cols - 1 - c)]
+    if rows == cols:
+        maps += [lambda r, c: (c, r), lambda r, c: (c, rows - 1 - r),
+                 lambda r, c: (cols - 1 - c, r), lambda r, c: (cols - 1 - c, rows - 1 - r)]
+    perms = []
+    for f in maps:
+        moved = [f(*divmod(i, cols)) for i in range(rows * cols)]
+        perms.append(tuple(r * cols + c for r, c in moved))
+    inverse = tuple(tuple(perm.index(c) for c in range(rows * cols)) for perm in perms)
+    return tuple(perms), inverse
+
+
+@lru_cache(maxsize=None)
+def byte_tables(rows, cols):
+    # tables[s][b][v]: the cells of byte b (value v) of a mask, moved by symmetry s
+    cells = rows * cols
+    perms, _ = symmetries(rows, cols)
+    tables = []
+    for perm in perms:
+        per_byte = []
+        for b in range((cells + 7) // 8):
+            row = []
+            for v in range(256):
+                mask = 0
+                for j in range(8):
+                    if v >> j & 1 and 8 * b + j < cells:
+                        mask |= 1 << perm[8 * b + j]
+                row.append(mask)
+            per_byte.append(tuple(row))
+        tables.append(tuple(per_byte))
+    return tuple(tables)
+
+
+def canonical(x, o, rows, cols):
+    # Smallest key over the board symmetries, plus the symmetry that produced it
+    cells = rows * cols
+    best_key, best_sym = None, 0
+    for s, tables in enumerate(byte_tables(rows, cols)):
+        tx = to = 0
+        for b, table in enumerate(tables):
+            tx |= table[x >> 8 * b & 255]
+            to |= table[o >> 8 * b & 255]
+        key = tx | to << cells
+        if best_key is None or key < best_key:
+            best_key, best_sym = key, s
+    return best_key, best_sym
+
+
+class Tablebase:
+    # Sorted records in an mmapped file, found by binary search
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, self.cols, self.k, self.exact, self.count = HEADER.unpack_from(self.mm)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{path} is not a tablebase")
+        if len(self.mm) != HEADER.size + self.count * RECORD.size:
+            raise ValueError(f"{path} is truncated")
+
+    def lookup(self, key):
+        # (value, best-move mask) for a canonical key, or None
+        lo, hi = 0, self.count
+        mm, size = self.mm, RECORD.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe, value, moves = RECORD.unpack_from(mm, HEADER.size + mid * size)
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return value, moves
+        return None
+
+    def best_moves(self, board):
+        # Best moves as (row, col) for an MNKBoard, or None when the position is not stored
+        x = o = 0
+        for i, cell in enumerate(board.cells):
+            if cell == X:
+                x |= 1 << i
+            elif cell == O:
+                o |= 1 << i
+        key, sym = canonical(x, o, self.rows, self.cols)
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        inverse = symmetries(self.rows, self.cols)[1][sym]
+        cells = [inverse[c] for c in range(self.rows * self.cols) if entry[1] >> c & 1]
+        return [divmod(i, self.cols) for i in cells] or None
+
+    def best_move(self, board, rng=random):
+        moves = self.best_moves(board)
+        return rng.choice(moves) if moves else None
+
+
+_tablebases = {}
+
+
+def get_tablebase(rows, cols, k, directory=TABLEBASE_DIR):
+    # The table for this board if one has been built, opened once per process
+    path = tablebase_path(rows, cols, k, directory)
+    if path not in _tablebases:
+        try:
+            _tablebases[path] = Tablebase(path)
+        except (OSError, ValueError, struct.error):
+            _tablebases[path] = None
+    return _tablebases[path]
+
+
+# ---------- Building (NumPy) ----------
+def _require_numpy():
+    # Imported here so the games, which only probe, never pay for NumPy
+    global np
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("Building a tablebase needs NumPy: pip install numpy") from None
+
+
+@lru_cache(maxsize=None)
+def _np_tables(rows, cols):
+    return np.array(byte_tables(rows, cols), dtype=np.uint64)
+
+
+@lru_cache(maxsize=None)
+def _np_lines(rows, cols, k):
+    return [np.uint64(sum(1 << i for i in line)) for line in _geometry(rows, cols, k)[0]]
+
+
+def _canonical_np(x, o, rows, cols):
+    tables = _np_tables(rows, cols)
+    cells = np.uint64(rows * cols)
+    best = None
+    for s in range(len(tables)):
+        tx = np.zeros(len(x), dtype=np.uint64)
+        to = np.zeros(len(x), dtype=np.uint64)
+        for b in range(tables.shape[1]):
+            shift = np.uint64(8 * b)
+            tx |= tables[s, b][(x >> shift) & np.uint64(255)]
+            to |= tables[s, b][(o >> shift) & np.uint64(255)]
+        key = tx | to << cells
+        best = key if best is None else np.minimum(best, key)
+    return best
+
+
+def _wins_np(mask, rows, cols, k):
+    won = np.zeros(len(mask), dtype=bool)
+    for line in _np_lines(rows, cols, k):
+        won |= (mask & line) == line
+    return won
+
+
+def _split(keys, rows, cols):
+    full = np.uint64((1 << rows * cols) - 1)
+    return keys & full, keys >> np.uint64(rows * cols)
+
+
+def _layer_file(work, n, kind):
+    return os.path.join(work, f"{kind}_{n:03d}.npy")
+
+
+def _save(path, array):
+    # Written under a temporary name first, so a file that exists is complete
+    tmp = path + ".tmp.npy"
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+def _forward_chunk(rows, cols, k, work, n, start, stop):
+    # Unique canonical children of the non-terminal positions keys[start:stop] of layer n
+    _require_numpy()
+    keys = np.load(_layer_file(work, n, "keys"), mmap_mode="r")[start:stop]
+    x, o = _split(keys, rows, cols)
+    if n:
+        # The side that just moved may have won already
+        keys_live = ~_wins_np(x if n % 2 else o, rows, cols, k)
+        x, o = x[keys_live], o[keys_live]
+    children = []
+    for c in range(rows * cols):
+        bit = np.uint64(1 << c)
+        free = ((x | o) & bit) == 0
+        if n % 2 == 0:
+            children.append(_canonical_np(x[free] | bit, o[free], rows, cols))
+        else:
+            children.append(_canonical_np(x[free], o[free] | bit, rows, cols))
+    return np.unique(np.concatenate(children)) if children else np.zeros(0, dtype=np.uint64)
+
+
+def _part_file(work, n, start):
+    return os.path.join(work, f"values_{n:03d}_{start:010d}.npz")
+
+
+def _backward_chunk(rows, cols, k, work, n, start, stop):
+    # Values and best-move masks of layer n positions from the solved layer n + 1
+    _require_numpy()
+    cells = rows * cols
+    keys = np.load(_layer_file(work, n, "keys"), mmap_mode="r")[start:stop]
+    x, o = _split(keys, rows, cols)
+    empties = cells - n
+    values = np.zeros(len(keys), dtype=np.int8)
+    moves = np.zeros(len(keys), dtype=np.uint32)
+    won = _wins_np(x if n % 2 else o, rows, cols, k) if n else np.zeros(len(keys), dtype=bool)
+    # Same scale as the 3x3 solver: a loss with e empty cells left is -(1 + e)
+    values[won] = -(1 + empties)
+    live = ~won
+    if empties and live.any():
+        child_keys = np.load(_layer_file(work, n + 1, "keys"), mmap_mode="r")
+        child_values = np.load(_layer_file(work, n + 1, "values"), mmap_mode="r")
+        lx, lo = x[live], o[live]
+        scores = np.full((cells, len(lx)), -128, dtype=np.int16)
+        for c in range(cells):
+            bit = np.uint64(1 << c)
+            free = ((lx | lo) & bit) == 0
+            if n % 2 == 0:
+                child = _canonical_np(lx[free] | bit, lo[free], rows, cols)
+            else:
+                child = _canonical_np(lx[free], lo[free] | bit, rows, cols)
+            scores[c, free] = -child_values[np.searchsorted(child_keys, child)].astype(np.int16)
+        best = scores.max(axis=0)
+        values[live] = best
+        weights = (np.uint32(1) << np.arange(cells, dtype=np.uint32))[:, None]
+        moves[live] = ((scores == best) * weights).sum(axis=0, dtype=np.uint32)
+    path = _part_file(work, n, start)
+    np.savez(path + ".tmp.npz", values=values, moves=moves)
+    os.replace(path + ".tmp.npz", path)
+    return path
+
+
+def _book_chunk(rows, cols, k, work, n, start, stop, depth):
+    # Best move by a depth-limited search for each position (heuristic, value 0)
+    _require_numpy()
+    keys = np.load(_layer_file(work, n, "keys"), mmap_mode="r")[start:stop]
+    values = np.zeros(len(keys), dtype=np.int8)
+    moves = np.zeros(len(keys), dtype=np.uint32)
+    searcher = Searcher(time_budget=3600, max_depth=depth)
+    full = (1 << rows * cols) - 1
+    for i, key in enumerate(keys.tolist()):
+        x, o = key & full, key >> rows * cols
+        board = MNKBoard(rows, cols, k)
+        xs = [c for c in range(rows * cols) if x >> c & 1]
+        os_ = [c for c in range(rows * cols) if o >> c & 1]
+        for j in range(len(xs) + len(os_)):
+            board.play(xs[j // 2] if j % 2 == 0 else os_[j // 2])
+        move = searcher.best_move(board)
+        if move is not None:
+            moves[i] = 1 << (move[0] * cols + move[1])
+    path = _part_file(work, n, start)
+    np.savez(path + ".tmp.npz", values=values, moves=moves)
+    os.replace(path + ".tmp.npz", path)
+    return path
+
+
+def _solve_layer(pool, rows, cols, k, work, n, task, *extra):
+    # Runs task over every chunk of layer n that has no part file yet, then joins the parts
+    if os.path.exists(_layer_file(work, n, "values")):
+        return
+    count = len(np.load(_layer_file(work, n, "keys"), mmap_mode="r"))
+    starts = range(0, count, CHUNK_SIZE)
+    todo = [s for s in starts if not os.path.exists(_part_file(work, n, s))]
+    for future in [pool.submit(task, rows, cols, k, work, n, s, min(s + CHUNK_SIZE, count), *extra)
+                   for s in todo]:
+        future.result()
+    parts = [np.load(_part_file(work, n, s)) for s in starts]
+    values = np.concatenate([p["values"] for p in parts]) if parts else np.zeros(0, dtype=np.int8)
+    moves = np.concatenate([p["moves"] for p in parts]) if parts else np.zeros(0, dtype=np.uint32)
+    _save(_layer_file(work, n, "moves"), moves)
+    _save(_layer_file(work, n, "values"), values)
+    for s in starts:
+        os.remove(_part_file(work, n, s))
+
+
+def build(rows, cols, k, workers=None, directory=TABLEBASE_DIR, book_stones=BOOK_STONES,
+          book_depth=BOOK_DEPTH, keep_work=False, log=print):
+    # Writes the table file and returns its path. Progress is kept in a work
+    # directory next to it; running the same build again resumes from there.
+    _require_numpy()
+    cells = rows * cols
+    if cells > 32:
+        raise ValueError("Boards larger than 32 cells are not supported")
+    exact = cells <= EXACT_MAX_CELLS
+    last = cells if exact else min(book_stones - 1, cells)
+    path = tablebase_path(rows, cols, k, directory)
+    work = path + ".work"
+    os.makedirs(work, exist_ok=True)
+    start = time.perf_counter()
+
+    from concurrent.futures import ProcessPoolExecutor  # deferred: probing never needs a pool
+    with ProcessPoolExecutor(workers) as pool:
+        # Forward: every reachable canonical position, layer by layer
+        if not os.path.exists(_layer_file(work, 0, "keys")):
+            _save(_layer_file(work, 0, "keys"), np.zeros(1, dtype=np.uint64))
+        for n in range(last):
+            if os.path.exists(_layer_file(work, n + 1, "keys")):
+                continue
+            count = len(np.load(_layer_file(work, n, "keys"), mmap_mode="r"))
+            futures = [pool.submit(_forward_chunk, rows, cols, k, work, n, s, min(s + CHUNK_SIZE, count))
+                       for s in range(0, count, CHUNK_SIZE)]
+            children = [f.result() for f in futures]
+            layer = np.unique(np.concatenate(children)) if children else np.zeros(0, dtype=np.uint64)
+            _save(_layer_file(work, n + 1, "keys"), layer)
+            log(f"layer {n + 1:3d}: {len(layer):>10,} positions  ({time.perf_counter() - start:.1f}s)")
+
+        # Backward: values from the full board down (exact), or a search per position (book)
+        for n in range(last, -1, -1):
+            if exact:
+                _solve_layer(pool, rows, cols, k, work, n, _backward_chunk)
+            else:
+                _solve_layer(pool, rows, cols, k, work, n, _book_chunk, book_depth)
+            log(f"layer {n:3d} solved  ({time.perf_counter() - start:.1f}s)")
+
+    # Only positions still in play are stored; won and full boards are recognised on the spot
+    record = np.dtype([("key", "<u8"), ("value", "i1"), ("moves", "<u4")])
+    tables = []
+    for n in range(last + 1):
+        keys = np.load(_layer_file(work, n, "keys"))
+        values = np.load(_layer_file(work, n, "values"))
+        moves = np.load(_layer_file(work, n, "moves"))
+        table = np.zeros(len(keys), dtype=record)
+        table["key"], table["value"], table["moves"] = keys, values, moves
+        tables.append(table[moves != 0])
+    table = np.concatenate(tables)
+    table.sort(order="key")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(FILE_MAGIC, rows, cols, k, int(exact), len(table)))
+        table.tofile(f)
+    os.replace(tmp, path)
+    if not keep_work:
+        shutil.rmtree(work)
+    _tablebases.pop(path, None)
+    log(f"Wrote {len(table):,} positions to {path} ({time.perf_counter() - start:.1f}s)")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query endgame tablebases for the larger boards")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_cmd = commands.add_parser("build", help="build (or resume building) a tablebase")
+    build_cmd.add_argument("variant", choices=list(BUILDABLE))
+    build_cmd.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    build_cmd.add_argument("--dir", default=TABLEBASE_DIR)
+    build_cmd.add_argument("--book-stones", type=int, default=BOOK_STONES,
+                           help="larger boards: store positions with fewer stones than this")
+    build_cmd.add_argument("--book-depth", type=int, default=BOOK_DEPTH, help="larger boards: search depth")
+    build_cmd.add_argument("--keep-work", action="store_true", help="keep the layer files after finishing")
+    info_cmd = commands.add_parser("info", help="describe a built tablebase")
+    info_cmd.add_argument("variant", choices=list(BUILDABLE))
+    info_cmd.add_argument("--dir", default=TABLEBASE_DIR)
+    args = parser.parse_args(argv)
+
+    rows, cols, k = BUILDABLE[args.variant]
+    if args.command == "build":
+        try:
+            build(rows, cols, k, args.workers, args.dir, args.book_stones, args.book_depth, args.keep_work)
+        except (ValueError, ImportError) as e:
+            sys.exit(str(e))
+        return
+    table = get_tablebase(rows, cols, k, args.dir)
+    if table is None:
+        sys.exit(f"No tablebase for {args.variant} in {args.dir}")
+    kind = "exact" if table.exact else "opening book"
+    print(f"{args.variant}: {table.count:,} positions ({kind})")
+    if table.exact:
+        value = table.lookup(0)[0]
+        print("First player " + ("wins" if value > 0 else "loses" if value < 0 else "draws") + " with best play")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from score_store import RPSStore
+
+
+class FlakyRPSStore(RPSStore):
+    # Fails the named write once, the way a locked database does
+    fail_op = None
+
+    def _fail_once(self, op):
+        if self.fail_op == op:
+            self.fail_op = None
+            raise sqlite3.OperationalError("database is locked")
+
+    def apply_rps_session(self, conn, *args):
+        super().apply_rps_session(conn, *args)
+        self._fail_once("rps_session")
+
+    def apply_rps_round(self, conn, *args):
+        super().apply_rps_round(conn, *args)
+        self._fail_once("rps_round")
+
+
+class RPSStoreFailureTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = FlakyRPSStore(os.path.join(self.directory.name, "rps.db"))
+        self.stderr = contextlib.redirect_stderr(io.StringIO())
+        self.stderr.__enter__()
+
+    def tearDown(self):
+        self.store.close()
+        self.stderr.__exit__(None, None, None)
+        self.directory.cleanup()
+
+    def flush(self):
+        flusher = threading.Thread(target=self.store.flush, daemon=True)
+        flusher.start()
+        flusher.join(10)
+        self.assertFalse(flusher.is_alive(), "flush() blocked, the writer thread died")
+
+    def rounds_by_player(self):
+        return self.store.reader.execute(
+            "SELECT s.player, r.user_move FROM rps_rounds r JOIN rps_sessions s ON s.id = r.session_id "
+            "ORDER BY s.player, r.number"
+        ).fetchall()
+
+    def play(self, player, move, rounds=3):
+        session = self.store.start_session(player, "Easy")
+        for _ in range(rounds):
+            self.store.record_round(session, move, "Rock", "win")
+        return session
+
+    def test_writer_survives_failed_session_insert(self):
+        self.store.fail_op = "rps_session"
+        alice = self.store.start_session("alice", "Easy")
+        self.flush()
+        self.store.record_round(alice, "Rock", "Paper", "lose")
+        self.store.end_session(alice)
+        self.play("bob", "Paper")
+        self.flush()
+        self.assertEqual(self.rounds_by_player(), [("bob", 1)] * 3)
+
+    def test_rolled_back_id_is_not_reused_for_old_rounds(self):
+        # alice's session id is rolled back with her first round and then given to bob
+        self.store.fail_op = "rps_round"
+        alice = self.play("alice", "Rock", rounds=1)
+        self.flush()
+        self.play("bob", "Paper", rounds=1)
+        self.flush()
+        self.store.record_round(alice, "Rock", "Paper", "lose")
+        self.flush()
+        for player, move in self.rounds_by_player():
+            self.assertEqual(move, 0 if player == "alice" else 1)
+        self.assertEqual(self.rounds_by_player(), [("bob", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
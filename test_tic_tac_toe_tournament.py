@@ -0,0 +1,32 @@
+import unittest
+
+from mnk_engine import VARIANTS
+from tic_tac_toe_tournament import check_players, run_tournament
+
+# Every kind of player, with short searches so the big boards stay quick
+PLAYER_SPECS = ("random", "heuristic", "solver", "solver:0.5", "search", "search:0.001")
+THREE_BY_THREE_ONLY = ("heuristic", "solver")
+
+
+class PlayerSpecTest(unittest.TestCase):
+    def test_every_spec_on_every_variant(self):
+        for variant, dims in VARIANTS.items():
+            for spec in PLAYER_SPECS:
+                with self.subTest(variant=variant, spec=spec):
+                    if spec.partition(":")[0] in THREE_BY_THREE_ONLY and dims != (3, 3, 3):
+                        with self.assertRaises(ValueError):
+                            check_players(variant, (spec, "random"))
+                        continue
+                    fast = spec if variant == "3x3" or not spec.startswith("search") else "search:0.001"
+                    report = run_tournament(2, fast, "random", variant, workers=1, alternate=True)
+                    self.assertEqual(report["games"], 2)
+
+    def test_search_against_3x3_players(self):
+        for spec in ("heuristic", "solver", "random"):
+            with self.subTest(spec=spec):
+                report = run_tournament(2, "search:0.001", spec, "3x3", workers=1, alternate=True)
+                self.assertEqual(report["games"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
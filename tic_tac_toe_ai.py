@@ -1,9 +1,24 @@
-import tkinter as tk
-from tkinter import messagebox, simpledialog
-import random, pickle, os
-
-# Score file
-SCORE_FILE = "tic_tac_toe_scores.pkl"
+import argparse, random, threading
+from concurrent.futures import ThreadPoolExecutor
+import tic_tac_toe_tournament
+from game_records import GAME_RECORD_FILE, GameRecordWriter
+from mnk_engine import VARIANTS, Searcher, new_board
+from score_store import ScoreStore
+from tablebase import get_tablebase
+from tic_tac_toe_engine import Board
+from tic_tac_toe_solver import DIFFICULTIES, get_solver
+
+# tkinter is imported by load_tk() once a window is opened, so tournaments run
+# (and the module imports) without it
+tk = messagebox = simpledialog = None
+
+# Score database (SQLite)
+SCORE_FILE = "tic_tac_toe_scores.db"
+
+# Seconds the AI may think per move on boards larger than 3x3
+AI_TIME_BUDGET = 1.0
+# How often the Tk loop checks whether the AI worker has finished, in ms
+AI_POLL_MS = 30
 
 # Themes
 THEMES = {
@@ -12,8 +27,15 @@ THEMES = {
     "Ocean": {"bg": "#DFF6FF", "fg": "#006994", "btn_bg": "#006994", "btn_fg": "white"}
 }
 
+def load_tk():
+    global tk, messagebox, simpledialog
+    import tkinter as tk
+    from tkinter import messagebox, simpledialog
+
+
 class TicTacToe:
-    def __init__(self, root, mode, player_x_name, player_o_name):
+    def __init__(self, root, mode, player_x_name, player_o_name, variant="3x3"):
+        load_tk()
         self.root = root
         self.root.title("Tic Tac Toe")
         self.root.resizable(False, False)
@@ -23,61 +45,92 @@ class TicTacToe:
         self.player_o_name = player_o_name
         self.theme_name = "Classic"
         self.theme = THEMES[self.theme_name]
-        self.current_player = "X"
-        self.board = [["" for _ in range(3)] for _ in range(3)]
-        self.history = []
+        self.difficulty = "Hard"
+        self.variant = variant
+        self.rows, self.cols, self.k = VARIANTS[variant]
+        self.engine = new_board(self.rows, self.cols, self.k)
+        self.searcher = Searcher(AI_TIME_BUDGET)
+        # AI search runs on a worker thread; these track the move in progress
+        self.ai_executor = ThreadPoolExecutor(max_workers=1)
+        self.ai_after_id = None
+        self.ai_future = None
+        self.ai_stop = None
         self.timer_running = False
         self.time_elapsed = 0
         self.timer_id = None
 
+        self.store = ScoreStore(SCORE_FILE)
+        # Finished 3x3 games are archived in the packed game-record format
+        self.records = GameRecordWriter(GAME_RECORD_FILE) if self.variant == "3x3" else None
         self.scores = self.load_scores()
         self.create_ui()
         self.apply_theme()
         self.start_timer()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
     def create_ui(self):
         # Score
         self.score_label = tk.Label(self.root, text=self.score_text(), font=("Arial", 14))
-        self.score_label.grid(row=0, column=0, columnspan=3, pady=(5, 0))
+        self.score_label.grid(row=0, column=0, columnspan=self.cols, pady=(5, 0))
 
         # Timer
         self.timer_label = tk.Label(self.root, text="Time: 0s", font=("Arial", 12))
-        self.timer_label.grid(row=1, column=0, columnspan=3, pady=(0, 5))
+        self.timer_label.grid(row=1, column=0, columnspan=self.cols, pady=(0, 5))
 
-        # Board buttons
+        # Board buttons, shrunk to fit larger boards
+        size = max(self.rows, self.cols)
+        font_size = max(10, 84 // size)
+        width = 5 if size <= 3 else 3 if size <= 5 else 2
+        height = 2 if size <= 5 else 1
         self.buttons = []
-        for r in range(3):
+        for r in range(self.rows):
             row_buttons = []
-            for c in range(3):
-                btn = tk.Button(self.root, text="", font=("Arial", 28, "bold"),
-                                width=5, height=2, relief="solid", bd=2,
+            for c in range(self.cols):
+                btn = tk.Button(self.root, text="", font=("Arial", font_size, "bold"),
+                                width=width, height=height, relief="solid", bd=2,
                                 command=lambda row=r, col=c: self.make_move(row, col))
                 btn.grid(row=r+2, column=c, padx=2, pady=2, sticky="nsew")
                 row_buttons.append(btn)
             self.buttons.append(row_buttons)
 
-        # Restart & Undo
-        self.restart_button = tk.Button(self.root, text="Restart", command=self.reset_game, width=10)
-        self.restart_button.grid(row=5, column=0, pady=5)
+        # Restart, Undo & Theme menu
+        self.controls_frame = tk.Frame(self.root)
+        self.controls_frame.grid(row=self.rows+2, column=0, columnspan=self.cols, pady=5)
 
-        self.undo_button = tk.Button(self.root, text="Undo", command=self.undo_move, width=10)
-        self.undo_button.grid(row=5, column=1, pady=5)
+        self.restart_button = tk.Button(self.controls_frame, text="Restart", command=self.reset_game, width=10)
+        self.restart_button.pack(side="left", padx=2)
+
+        self.undo_button = tk.Button(self.controls_frame, text="Undo", command=self.undo_move, width=10)
+        self.undo_button.pack(side="left", padx=2)
 
-        # Theme menu
         self.theme_var = tk.StringVar(value=self.theme_name)
-        self.theme_menu = tk.OptionMenu(self.root, self.theme_var, *THEMES.keys(), command=self.change_theme)
-        self.theme_menu.grid(row=5, column=2, pady=5)
+        self.theme_menu = tk.OptionMenu(self.controls_frame, self.theme_var, *THEMES.keys(), command=self.change_theme)
+        self.theme_menu.pack(side="left", padx=2)
 
         # Restart All
         self.restart_all_button = tk.Button(self.root, text="Restart All (Reset Scores)",
                                             command=self.reset_all, width=30)
-        self.restart_all_button.grid(row=6, column=0, columnspan=3, pady=10)
+        self.restart_all_button.grid(row=self.rows+3, column=0, columnspan=self.cols, pady=10)
+
+        # AI difficulty
+        self.difficulty_menu = None
+        if self.game_mode == "PvAI":
+            self.difficulty_var = tk.StringVar(value=self.difficulty)
+            self.difficulty_menu = tk.OptionMenu(self.root, self.difficulty_var, *DIFFICULTIES.keys(),
+                                                 command=self.change_difficulty)
+            self.difficulty_menu.grid(row=self.rows+4, column=0, columnspan=self.cols, pady=(0, 10))
+
+        # Shown while the AI is searching
+        self.status_label = tk.Label(self.root, text="", font=("Arial", 11, "italic"))
+        self.status_label.grid(row=self.rows+5, column=0, columnspan=self.cols, pady=(0, 5))
 
     def apply_theme(self):
         self.theme = THEMES[self.theme_name]
         self.root.config(bg=self.theme["bg"])
+        self.controls_frame.config(bg=self.theme["bg"])
         self.score_label.config(bg=self.theme["bg"], fg=self.theme["fg"])
         self.timer_label.config(bg=self.theme["bg"], fg=self.theme["fg"])
+        self.status_label.config(bg=self.theme["bg"], fg=self.theme["fg"])
         for r in self.buttons:
             for b in r:
                 b.config(bg=self.theme["btn_bg"], fg=self.theme["btn_fg"])
@@ -85,132 +138,139 @@ class TicTacToe:
         self.undo_button.config(bg=self.theme["btn_bg"], fg=self.theme["btn_fg"])
         self.restart_all_button.config(bg=self.theme["btn_bg"], fg=self.theme["btn_fg"])
         self.theme_menu.config(bg=self.theme["btn_bg"], fg=self.theme["btn_fg"])
+        if self.difficulty_menu:
+            self.difficulty_menu.config(bg=self.theme["btn_bg"], fg=self.theme["btn_fg"])
 
     def change_theme(self, new_theme):
         self.theme_name = new_theme
         self.apply_theme()
 
+    def change_difficulty(self, new_difficulty):
+        self.difficulty = new_difficulty
+
     def score_text(self):
         return f"{self.player_x_name} (X): {self.scores['X']}  {self.player_o_name} (O): {self.scores['O']}  Draws: {self.scores['D']}"
 
-    def save_scores(self):
-        with open(SCORE_FILE, "wb") as f:
-            pickle.dump(self.scores, f)
-
     def load_scores(self):
-        if os.path.exists(SCORE_FILE):
-            with open(SCORE_FILE, "rb") as f:
-                return pickle.load(f)
-        return {"X": 0, "O": 0, "D": 0}
+        # Scoreboard of this pairing (X, O and mode), as in the old score file
+        return dict(self.store.scores(self.player_x_name, self.player_o_name, self.game_mode))
+
+    @property
+    def current_player(self):
+        return self.engine.current_player
 
     def make_move(self, row, col):
-        if self.board[row][col] == "":
-            self.board[row][col] = self.current_player
-            self.buttons[row][col].config(text=self.current_player)
-            self.history.append((row, col))
-            if self.check_winner(self.current_player):
-                self.end_game(f"{self.get_player_name(self.current_player)} wins!")
+        # Clicks are ignored while the AI is working on its move
+        if self.ai_after_id is None:
+            self.play_move(row, col)
+
+    def play_move(self, row, col):
+        player = self.engine.current_player
+        if self.engine.make_move(row, col):
+            self.buttons[row][col].config(text=player)
+            if self.check_winner(player):
+                self.end_game(f"{self.get_player_name(player)} wins!", player)
                 return
             elif self.is_draw():
-                self.end_game("Draw!")
+                self.end_game("Draw!", "D")
                 return
-            self.switch_player()
 
             if self.game_mode == "PvAI" and self.current_player == "O":
-                self.root.after(500, self.ai_move)
+                self.status_label.config(text=f"{self.player_o_name} is thinking...")
+                self.root.config(cursor="watch")
+                self.ai_after_id = self.root.after(500, self.ai_move)
 
     def ai_move(self):
-        for r in range(3):
-            for c in range(3):
-                if self.board[r][c] == "":
-                    self.board[r][c] = "O"
-                    if self.check_winner("O"):
-                        self.buttons[r][c].config(text="O")
-                        self.end_game(f"{self.player_o_name} wins!")
-                        return
-                    self.board[r][c] = ""
-
-        for r in range(3):
-            for c in range(3):
-                if self.board[r][c] == "":
-                    self.board[r][c] = "X"
-                    if self.check_winner("X"):
-                        self.board[r][c] = "O"
-                        self.buttons[r][c].config(text="O")
-                        if self.check_winner("O"):
-                            self.end_game(f"{self.player_o_name} wins!")
-                        else:
-                            self.switch_player()
-                        return
-                    self.board[r][c] = ""
-
-        empty = [(r, c) for r in range(3) for c in range(3) if self.board[r][c] == ""]
-        if empty:
-            r, c = random.choice(empty)
-            self.board[r][c] = "O"
-            self.buttons[r][c].config(text="O")
-            if self.check_winner("O"):
-                self.end_game(f"{self.player_o_name} wins!")
-                return
-            elif self.is_draw():
-                self.end_game("Draw!")
-                return
-            self.switch_player()
+        # Search on a snapshot of the board so the worker never races the GUI
+        if self.current_player != "O":
+            self.cancel_ai()
+            return
+        self.ai_stop = threading.Event()
+        self.ai_future = self.ai_executor.submit(self.compute_ai_move, self.engine.copy(),
+                                                 DIFFICULTIES[self.difficulty], self.ai_stop)
+        self.ai_after_id = self.root.after(AI_POLL_MS, self.poll_ai)
+
+    def poll_ai(self):
+        if not self.ai_future.done():
+            self.ai_after_id = self.root.after(AI_POLL_MS, self.poll_ai)
+            return
+        future = self.ai_future
+        self.cancel_ai()
+        move = future.result()
+        if move:
+            self.play_move(*move)
+
+    def cancel_ai(self):
+        if self.ai_after_id is not None:
+            self.root.after_cancel(self.ai_after_id)
+            self.ai_after_id = None
+        if self.ai_stop is not None:
+            self.ai_stop.set()
+            self.ai_stop = None
+        self.ai_future = None
+        self.status_label.config(text="")
+        self.root.config(cursor="")
+
+    def compute_ai_move(self, engine, blunder, stop=None):
+        # Runs on the worker thread
+        if isinstance(engine, Board):
+            return get_solver().best_move(engine, blunder)
+        if blunder and random.random() < blunder:
+            return random.choice(engine.empty_cells())
+        # Precomputed boards answer instantly; anything not in the table is searched
+        table = get_tablebase(engine.rows, engine.cols, engine.k)
+        move = table.best_move(engine) if table is not None else None
+        if move is not None:
+            return move
+        return self.searcher.best_move(engine, stop=stop)
 
     def get_player_name(self, symbol):
         return self.player_x_name if symbol == "X" else self.player_o_name
 
-    def switch_player(self):
-        self.current_player = "O" if self.current_player == "X" else "X"
-
     def check_winner(self, player):
-        for r in range(3):
-            if all(self.board[r][c] == player for c in range(3)):
-                return True
-        for c in range(3):
-            if all(self.board[r][c] == player for r in range(3)):
-                return True
-        if all(self.board[i][i] == player for i in range(3)):
-            return True
-        if all(self.board[i][2-i] == player for i in range(3)):
-            return True
-        return False
+        return self.engine.check_winner(player)
 
     def is_draw(self):
-        return all(self.board[r][c] != "" for r in range(3) for c in range(3))
+        return self.engine.is_draw()
 
-    def end_game(self, result):
-        if self.player_x_name in result:
-            self.scores["X"] += 1
-        elif self.player_o_name in result:
-            self.scores["O"] += 1
-        else:
-            self.scores["D"] += 1
-        self.save_scores()
+    def end_game(self, result, winner):
+        self.store.record_game(self.game_mode, self.player_x_name, self.player_o_name, winner,
+                               len(self.engine.history), self.time_elapsed, self.variant)
+        self.scores = self.load_scores()
+        if self.records:
+            self.records.append(self.engine.history, winner, self.game_mode)
+            self.records.flush()
         messagebox.showinfo("Game Over", result)
         self.reset_game()
 
     def reset_game(self):
-        self.board = [["" for _ in range(3)] for _ in range(3)]
+        self.cancel_ai()
+        self.engine.reset()
         for r in self.buttons:
             for b in r:
                 b.config(text="")
-        self.history.clear()
-        self.current_player = "X"
         self.score_label.config(text=self.score_text())
         self.time_elapsed = 0
 
     def reset_all(self):
-        self.scores = {"X": 0, "O": 0, "D": 0}
-        self.save_scores()
+        self.store.reset(self.player_x_name, self.player_o_name, self.game_mode)
+        self.scores = self.load_scores()
         self.reset_game()
 
     def undo_move(self):
-        if self.history:
-            last_row, last_col = self.history.pop()
-            self.board[last_row][last_col] = ""
+        self.cancel_ai()
+        move = self.engine.undo_move()
+        if move:
+            last_row, last_col = move
             self.buttons[last_row][last_col].config(text="")
-            self.switch_player()
+
+    def close(self):
+        self.cancel_ai()
+        self.ai_executor.shutdown(wait=False)
+        self.store.close()
+        if self.records:
+            self.records.close()
+        self.root.destroy()
 
     def start_timer(self):
         self.timer_running = True
@@ -224,9 +284,10 @@ class TicTacToe:
 
 
 def choose_game_mode():
+    load_tk()
     popup = tk.Tk()
     popup.title("Choose Game Mode")
-    popup.geometry("300x200")
+    popup.geometry("300x240")
     popup.resizable(False, False)
 
     def select_mode(mode):
@@ -243,12 +304,16 @@ def choose_game_mode():
 
         popup.destroy()
         root = tk.Tk()
-        TicTacToe(root, mode, player_x_name, player_o_name)
+        TicTacToe(root, mode, player_x_name, player_o_name, variant_var.get())
         root.mainloop()
 
     label = tk.Label(popup, text="Choose Game Mode", font=("Arial", 14))
     label.pack(pady=10)
 
+    variant_var = tk.StringVar(value="3x3")
+    variant_menu = tk.OptionMenu(popup, variant_var, *VARIANTS.keys())
+    variant_menu.pack(pady=5)
+
     btn_pvp = tk.Button(popup, text="Player vs Player", width=20, command=lambda: select_mode("PvP"))
     btn_pvp.pack(pady=5)
 
@@ -258,5 +323,19 @@ def choose_game_mode():
     popup.mainloop()
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tic Tac Toe with AI")
+    tic_tac_toe_tournament.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.tournament is not None and args.tournament < 1:
+        parser.error("--tournament needs at least 1 game")
+    if args.tournament is not None:
+        tic_tac_toe_tournament.main(args)
+    else:
+        import tk_instrument
+        tk_instrument.install()
+        choose_game_mode()
+
+
 if __name__ == "__main__":
-    choose_game_mode()
+    main()
@@ -0,0 +1,76 @@
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # only needed for the batch API
+    np = None
+
+from tic_tac_toe_engine import CELL_BITS, WIN_MASKS, WINNING
+
+# Board arrays are (N, 9) int8, row by row, with these cell values
+CELL_EMPTY, CELL_X, CELL_O = 0, 1, -1
+
+# Per position: X / O has three in a row (as check_winner), the board is full
+# (as is_draw), winner is CELL_X / CELL_O / 0, legal and threat arrays are (N, 9).
+# x_threats[i, c] counts the lines X completes by playing empty cell c.
+BatchResult = namedtuple("BatchResult", "x_wins o_wins winner full terminal legal x_threats o_threats")
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The batch evaluator needs NumPy: pip install numpy")
+
+
+def pack_boards(boards):
+    # (N, 9) cell array -> uint32 bitboards laid out as x | o << 9
+    _require_numpy()
+    boards = np.asarray(boards)
+    weights = np.array(CELL_BITS, dtype=np.uint32)
+    x = ((boards == CELL_X) * weights).sum(axis=1, dtype=np.uint32)
+    o = ((boards == CELL_O) * weights).sum(axis=1, dtype=np.uint32)
+    return x | o << 9
+
+
+def unpack_boards(packed):
+    _require_numpy()
+    packed = np.asarray(packed, dtype=np.uint32)
+    shifts = np.arange(9, dtype=np.uint32)
+    x = (packed[:, None] >> shifts) & 1
+    o = (packed[:, None] >> (shifts + 9)) & 1
+    return (x.astype(np.int8) * CELL_X + o.astype(np.int8) * CELL_O).astype(np.int8)
+
+
+def evaluate(boards):
+    # Accepts an (N, 9) int8 cell array or a 1-D array of packed bitboards
+    _require_numpy()
+    boards = np.asarray(boards)
+    packed = pack_boards(boards) if boards.ndim == 2 else boards.astype(np.uint32)
+    x = packed & 0x1FF
+    o = packed >> 9 & 0x1FF
+
+    winning = np.frombuffer(WINNING, dtype=np.uint8).astype(bool)
+    x_wins = winning[x]
+    o_wins = winning[o]
+    full = (x | o) == 0x1FF
+    terminal = x_wins | o_wins | full
+    winner = np.where(x_wins, CELL_X, np.where(o_wins, CELL_O, CELL_EMPTY)).astype(np.int8)
+
+    shifts = np.arange(9, dtype=np.uint32)
+    empty = ((~(x | o))[:, None] >> shifts & 1).astype(bool)
+    legal = empty & ~terminal[:, None]
+
+    popcount = np.array([bin(i).count("1") for i in range(512)], dtype=np.uint8)
+    x_threats = np.zeros((len(packed), 9), dtype=np.int8)
+    o_threats = np.zeros((len(packed), 9), dtype=np.int8)
+    for mask in WIN_MASKS:
+        x_count = popcount[x & mask]
+        o_count = popcount[o & mask]
+        # Two of the side's stones and no opposing stone: the remaining cell wins
+        x_open = (x_count == 2) & (o_count == 0)
+        o_open = (o_count == 2) & (x_count == 0)
+        for cell, bit in enumerate(CELL_BITS):
+            if mask & bit:
+                x_threats[:, cell] += x_open & empty[:, cell]
+                o_threats[:, cell] += o_open & empty[:, cell]
+
+    return BatchResult(x_wins, o_wins, winner, full, terminal, legal, x_threats, o_threats)
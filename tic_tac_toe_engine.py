@@ -0,0 +1,130 @@
+import random
+
+# Cells are numbered 0..8 row by row; each side is stored as a 9-bit integer
+FULL_MASK = 0x1FF
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+)
+CELL_BITS = tuple(1 << i for i in range(9))
+
+# CELL_LINES[i] lists the indices of the WIN_MASKS lines passing through cell i
+CELL_LINES = tuple(tuple(n for n, m in enumerate(WIN_MASKS) if m & CELL_BITS[i]) for i in range(9))
+
+# WINNING[bits] is 1 when the 9-bit pattern contains a full line
+WINNING = bytes(int(any((b & m) == m for m in WIN_MASKS)) for b in range(512))
+
+
+def cell_index(row, col):
+    return row * 3 + col
+
+
+def cell_coords(index):
+    return divmod(index, 3)
+
+
+class Board:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.x = 0
+        self.o = 0
+        self.current_player = "X"
+        self.history = []
+        # Stones per line for each side, the move count and the winner so far
+        self.counts = {"X": [0] * 8, "O": [0] * 8}
+        self.moves = 0
+        self.winner = ""
+
+    def copy(self):
+        board = Board.__new__(Board)
+        board.x = self.x
+        board.o = self.o
+        board.current_player = self.current_player
+        board.history = list(self.history)
+        board.counts = {"X": list(self.counts["X"]), "O": list(self.counts["O"])}
+        board.moves = self.moves
+        board.winner = self.winner
+        return board
+
+    def bits(self, player):
+        return self.x if player == "X" else self.o
+
+    def empty_mask(self):
+        return ~(self.x | self.o) & FULL_MASK
+
+    def cell(self, row, col):
+        bit = CELL_BITS[cell_index(row, col)]
+        if self.x & bit:
+            return "X"
+        if self.o & bit:
+            return "O"
+        return ""
+
+    def empty_cells(self):
+        empty = self.empty_mask()
+        return [cell_coords(i) for i in range(9) if empty & CELL_BITS[i]]
+
+    def make_move(self, row, col):
+        index = cell_index(row, col)
+        bit = CELL_BITS[index]
+        if self.winner or (self.x | self.o) & bit:
+            return False
+        player = self.current_player
+        if player == "X":
+            self.x |= bit
+            self.current_player = "O"
+        else:
+            self.o |= bit
+            self.current_player = "X"
+        # Only the lines through this cell can have been completed
+        counts = self.counts[player]
+        for line in CELL_LINES[index]:
+            counts[line] += 1
+            if counts[line] == 3:
+                self.winner = player
+        self.moves += 1
+        self.history.append((row, col))
+        return True
+
+    def undo_move(self):
+        if not self.history:
+            return None
+        row, col = self.history.pop()
+        index = cell_index(row, col)
+        bit = CELL_BITS[index]
+        self.x &= ~bit
+        self.o &= ~bit
+        self.current_player = "O" if self.current_player == "X" else "X"
+        counts = self.counts[self.current_player]
+        for line in CELL_LINES[index]:
+            counts[line] -= 1
+        self.moves -= 1
+        # No move is accepted after a win, so the undone move is the only one that could have won
+        self.winner = ""
+        return row, col
+
+    def check_winner(self, player):
+        return self.winner == player
+
+    def is_draw(self):
+        return self.moves == 9
+
+
+def heuristic_move(board, player, rng=random):
+    # Win if possible, otherwise block the opponent, otherwise play at random
+    own = board.bits(player)
+    opp = board.bits("O" if player == "X" else "X")
+    empty = board.empty_mask()
+    cells = [i for i in range(9) if empty & CELL_BITS[i]]
+    if not cells:
+        return None
+    for i in cells:
+        if WINNING[own | CELL_BITS[i]]:
+            return cell_coords(i)
+    for i in cells:
+        if WINNING[opp | CELL_BITS[i]]:
+            return cell_coords(i)
+    return cell_coords(rng.choice(cells))
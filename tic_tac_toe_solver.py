@@ -0,0 +1,206 @@
+import os
+import random
+import struct
+import sys
+
+from tic_tac_toe_engine import CELL_BITS, FULL_MASK, WINNING, cell_coords
+
+# Precomputed table of every reachable position, written by `python tic_tac_toe_solver.py`
+SOLVER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tic_tac_toe_solver.bin")
+FILE_MAGIC = b"TTTS"
+RECORD = struct.Struct("<IbH")  # canonical key, value, best-move mask
+
+# Probability that the AI ignores the table and plays a random legal move
+DIFFICULTIES = {"Easy": 0.6, "Medium": 0.25, "Hard": 0.0}
+
+# Centre first, then corners, then edges: good moves first means more cut-offs
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+POPCOUNT = bytes(bin(i).count("1") for i in range(512))
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+def _build_symmetries():
+    def rotate(r, c):
+        return c, 2 - r
+
+    def mirror(r, c):
+        return r, 2 - c
+
+    perms = []
+    for flip in (False, True):
+        for turns in range(4):
+            perm = []
+            for i in range(9):
+                r, c = cell_coords(i)
+                if flip:
+                    r, c = mirror(r, c)
+                for _ in range(turns):
+                    r, c = rotate(r, c)
+                perm.append(r * 3 + c)
+            perms.append(tuple(perm))
+    return perms
+
+
+# SYMMETRIES[s][i] is where cell i lands under symmetry s; INVERSE maps it back
+SYMMETRIES = _build_symmetries()
+INVERSE = [tuple(perm.index(c) for c in range(9)) for perm in SYMMETRIES]
+TRANSFORMS = [
+    tuple(sum(CELL_BITS[perm[i]] for i in range(9) if b & CELL_BITS[i]) for b in range(512))
+    for perm in SYMMETRIES
+]
+
+
+def canonical(x, o):
+    # Smallest key over the 8 board symmetries, plus the symmetry that produced it
+    best_key, best_sym = None, 0
+    for s, table in enumerate(TRANSFORMS):
+        key = table[x] | table[o] << 9
+        if best_key is None or key < best_key:
+            best_key, best_sym = key, s
+    return best_key, best_sym
+
+
+def _terminal_value(x, o):
+    # Value for the side to move, or None when the game is still going.
+    # Faster wins (and slower losses) score further from zero.
+    empty = ~(x | o) & FULL_MASK
+    if WINNING[x] or WINNING[o]:
+        return -(1 + POPCOUNT[empty])
+    if not empty:
+        return 0
+    return None
+
+
+class Solver:
+    def __init__(self, table=None):
+        self.tt = {}
+        self.table = table if table is not None else {}
+
+    def negamax(self, x, o, alpha=-10, beta=10):
+        value = _terminal_value(x, o)
+        if value is not None:
+            return value
+
+        key = canonical(x, o)[0]
+        entry = self.tt.get(key)
+        if entry:
+            flag, value = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        x_to_move = POPCOUNT[x] == POPCOUNT[o]
+        empty = ~(x | o) & FULL_MASK
+        alpha0 = alpha
+        best = -10
+        for i in MOVE_ORDER:
+            bit = CELL_BITS[i]
+            if not empty & bit:
+                continue
+            if x_to_move:
+                score = -self.negamax(x | bit, o, -beta, -alpha)
+            else:
+                score = -self.negamax(x, o | bit, -beta, -alpha)
+            if score > best:
+                best = score
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        if best <= alpha0:
+            self.tt[key] = (UPPER, best)
+        elif best >= beta:
+            self.tt[key] = (LOWER, best)
+        else:
+            self.tt[key] = (EXACT, best)
+        return best
+
+    def build(self):
+        # Walk every reachable position and record its value and all optimal moves
+        self.table.clear()
+        stack = [(0, 0)]
+        while stack:
+            x, o = stack.pop()
+            key = canonical(x, o)[0]
+            if key in self.table or _terminal_value(x, o) is not None:
+                continue
+            # Store the canonical orientation so moves can be mapped back later
+            cx, co = key & FULL_MASK, key >> 9
+            x_to_move = POPCOUNT[cx] == POPCOUNT[co]
+            empty = ~(cx | co) & FULL_MASK
+            scores = {}
+            for i in range(9):
+                bit = CELL_BITS[i]
+                if empty & bit:
+                    child = (cx | bit, co) if x_to_move else (cx, co | bit)
+                    scores[i] = -self.negamax(*child)
+                    stack.append(child)
+            value = max(scores.values())
+            moves = sum(CELL_BITS[i] for i, score in scores.items() if score == value)
+            self.table[key] = (value, moves)
+        return self
+
+    def value(self, x, o):
+        value = _terminal_value(x, o)
+        if value is not None:
+            return value
+        return self.table[canonical(x, o)[0]][0]
+
+    def best_moves(self, x, o):
+        key, sym = canonical(x, o)
+        moves = self.table[key][1]
+        return [cell_coords(INVERSE[sym][c]) for c in range(9) if moves & CELL_BITS[c]]
+
+    def best_move(self, board, blunder=0.0, rng=random):
+        if _terminal_value(board.x, board.o) is not None:
+            return None
+        if blunder and rng.random() < blunder:
+            return rng.choice(board.empty_cells())
+        return rng.choice(self.best_moves(board.x, board.o))
+
+    def save(self, path=SOLVER_FILE):
+        with open(path, "wb") as f:
+            f.write(FILE_MAGIC + struct.pack("<I", len(self.table)))
+            for key in sorted(self.table):
+                value, moves = self.table[key]
+                f.write(RECORD.pack(key, value, moves))
+
+    @classmethod
+    def load(cls, path=SOLVER_FILE):
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:4] != FILE_MAGIC:
+            raise ValueError(f"{path} is not a solver table")
+        (count,) = struct.unpack_from("<I", data, 4)
+        if len(data) != 8 + count * RECORD.size:
+            raise ValueError(f"{path} is truncated")
+        table = {key: (value, moves) for key, value, moves in RECORD.iter_unpack(data[8:])}
+        return cls(table)
+
+
+_solver = None
+
+
+def get_solver():
+    # Load the precomputed table when it is present, otherwise solve once per process
+    global _solver
+    if _solver is None:
+        try:
+            _solver = Solver.load()
+        except (OSError, ValueError):
+            _solver = Solver().build()
+    return _solver
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else SOLVER_FILE
+    solver = Solver().build()
+    solver.save(path)
+    print(f"Wrote {len(solver.table)} positions to {path}")
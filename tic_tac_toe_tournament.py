@@ -0,0 +1,192 @@
+import json
+import os
+import random
+import time
+
+from game_records import GameRecordWriter, game_mode, pack_game
+from latency import LatencyHistogram
+from mnk_engine import VARIANTS, MNKBoard, Searcher, new_board
+from tic_tac_toe_engine import Board, heuristic_move
+from tic_tac_toe_solver import get_solver
+
+# Games handed to a worker at a time; each chunk is seeded from its index, so
+# results do not depend on how chunks are scheduled across processes
+CHUNK_SIZE = 10_000
+
+PLAYER_HELP = ("random, heuristic (3x3), solver[:blunder] (3x3), "
+               "search[:seconds] (any board)")
+
+
+def make_player(spec, rng):
+    # "name" or "name:param" -> function(board) returning a (row, col) move
+    name, _, param = spec.partition(":")
+    if name == "random":
+        return lambda board: rng.choice(board.empty_cells())
+    if name == "heuristic":
+        return lambda board: heuristic_move(board, board.current_player, rng)
+    if name == "solver":
+        blunder = float(param) if param else 0.0
+        solver = get_solver()
+        return lambda board: solver.best_move(board, blunder, rng)
+    if name == "search":
+        searcher = Searcher(float(param) if param else 0.05)
+
+        def search(board):
+            # The search runs on the m,n,k engine; 3x3 games use the bitboard one
+            if isinstance(board, Board):
+                mnk = MNKBoard()
+                for row, col in board.history:
+                    mnk.make_move(row, col)
+                board = mnk
+            return searcher.best_move(board)
+        return search
+    raise ValueError(f"Unknown player '{spec}', expected one of: {PLAYER_HELP}")
+
+
+def check_players(variant, specs):
+    for spec in specs:
+        name = spec.partition(":")[0]
+        if name in ("heuristic", "solver") and VARIANTS[variant] != (3, 3, 3):
+            raise ValueError(f"Player '{name}' only supports the 3x3 board")
+        make_player(spec, random.Random())
+
+
+def play_game(board, players, latencies):
+    # players and latencies are indexed by symbol; returns "X", "O" or "D"
+    perf_counter = time.perf_counter
+    while True:
+        player = board.current_player
+        start = perf_counter()
+        row, col = players[player](board)
+        latencies[player].add(perf_counter() - start)
+        board.make_move(row, col)
+        if board.check_winner(player):
+            return player
+        if board.is_draw():
+            return "D"
+
+
+def run_chunk(variant, spec_a, spec_b, seed, chunk, games, alternate, record=False):
+    rng = random.Random(seed * 1_000_003 + chunk)
+    # The random player is the baseline; every other kind counts as an AI in the records
+    is_ai = {"a": spec_a.partition(":")[0] != "random", "b": spec_b.partition(":")[0] != "random"}
+    players = {"a": make_player(spec_a, rng), "b": make_player(spec_b, rng)}
+    latencies = {"a": LatencyHistogram(), "b": LatencyHistogram()}
+    results = {"win": 0, "draw": 0, "loss": 0}
+    moves = 0
+    records = bytearray()
+    board = new_board(*VARIANTS[variant])
+    for game in range(games):
+        # Player A takes X, or alternates colours game by game
+        a_symbol = "O" if alternate and (chunk * CHUNK_SIZE + game) % 2 else "X"
+        b_symbol = "O" if a_symbol == "X" else "X"
+        board.reset()
+        winner = play_game(
+            board,
+            {a_symbol: players["a"], b_symbol: players["b"]},
+            {a_symbol: latencies["a"], b_symbol: latencies["b"]},
+        )
+        moves += len(board.history)
+        if record:
+            ai = {a_symbol: is_ai["a"], b_symbol: is_ai["b"]}
+            records += pack_game(board.history, winner, game_mode(ai["X"], ai["O"]))
+        if winner == "D":
+            results["draw"] += 1
+        elif winner == a_symbol:
+            results["win"] += 1
+        else:
+            results["loss"] += 1
+    return results, moves, latencies, bytes(records)
+
+
+def run_tournament(games, spec_a="solver", spec_b="random", variant="3x3",
+                   workers=None, seed=0, alternate=False, record_path=None):
+    check_players(variant, (spec_a, spec_b))
+    if record_path and VARIANTS[variant] != (3, 3, 3):
+        raise ValueError("Game records only support the 3x3 board")
+    record = bool(record_path)
+    workers = workers or os.cpu_count() or 1
+    chunks = [(i, min(CHUNK_SIZE, games - i * CHUNK_SIZE))
+              for i in range((games + CHUNK_SIZE - 1) // CHUNK_SIZE)]
+
+    results = {"win": 0, "draw": 0, "loss": 0}
+    latencies = {"a": LatencyHistogram(), "b": LatencyHistogram()}
+    moves = 0
+    start = time.perf_counter()
+    if workers == 1:
+        outcomes = (run_chunk(variant, spec_a, spec_b, seed, i, n, alternate, record) for i, n in chunks)
+    else:
+        from concurrent.futures import ProcessPoolExecutor  # deferred: the GUI imports this module
+        pool = ProcessPoolExecutor(workers)
+        outcomes = pool.map(run_chunk,
+                            *zip(*[(variant, spec_a, spec_b, seed, i, n, alternate, record) for i, n in chunks]))
+    writer = GameRecordWriter(record_path) if record else None
+    try:
+        for chunk_results, chunk_moves, chunk_latencies, chunk_records in outcomes:
+            if writer:
+                writer.append_packed(chunk_records)
+            for key in results:
+                results[key] += chunk_results[key]
+            latencies["a"].merge(chunk_latencies["a"])
+            latencies["b"].merge(chunk_latencies["b"])
+            moves += chunk_moves
+    finally:
+        if workers != 1:
+            pool.shutdown()
+        if writer:
+            writer.close()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "variant": variant,
+        "player_a": spec_a,
+        "player_b": spec_b,
+        "games": games,
+        "workers": workers,
+        "seed": seed,
+        "alternate": alternate,
+        "rates": {key: value / games if games else 0.0 for key, value in results.items()},
+        "results": results,
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed else 0.0,
+        "moves_per_second": moves / elapsed if elapsed else 0.0,
+        "move_latency": {"a": latencies["a"].summary(), "b": latencies["b"].summary()},
+    }
+
+
+def print_report(report):
+    rates = report["rates"]
+    print(f"{report['variant']}: {report['player_a']} (A) vs {report['player_b']} (B), "
+          f"{report['games']} games on {report['workers']} workers, seed {report['seed']}")
+    print(f"A win {rates['win']:.2%}  draw {rates['draw']:.2%}  loss {rates['loss']:.2%}")
+    print(f"{report['games_per_second']:,.0f} games/s, {report['moves_per_second']:,.0f} moves/s "
+          f"({report['seconds']:.2f}s)")
+    for side in ("a", "b"):
+        lat = report["move_latency"][side]
+        print(f"{side.upper()} move latency ms: p50 {lat['p50_ms']:.4f}  p90 {lat['p90_ms']:.4f}  "
+              f"p99 {lat['p99_ms']:.4f}  p99.9 {lat['p99.9_ms']:.4f}  max {lat['max_ms']:.4f}")
+
+
+def add_arguments(parser):
+    parser.add_argument("--tournament", type=int, metavar="GAMES",
+                        help="play GAMES headless AI games instead of opening the window")
+    parser.add_argument("--player-a", default="solver", help=f"player A: {PLAYER_HELP}")
+    parser.add_argument("--player-b", default="random", help=f"player B: {PLAYER_HELP}")
+    parser.add_argument("--variant", default="3x3", choices=list(VARIANTS))
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--alternate", action="store_true", help="swap X and O every game")
+    parser.add_argument("--json", metavar="PATH", help="also write the report to PATH as JSON")
+    parser.add_argument("--record", metavar="PATH", help="append every 3x3 game to a game record file")
+
+
+def main(args):
+    try:
+        report = run_tournament(args.tournament, args.player_a, args.player_b, args.variant,
+                                args.workers, args.seed, args.alternate, args.record)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,278 @@
+import atexit
+import csv
+import json
+import os
+import sys
+import time
+import tkinter
+
+from latency import LatencyHistogram
+
+# Opt-in timing of everything the Tk mainloop runs. Set before starting an app:
+#   TK_INSTRUMENT=1                  report to tk_instrument.json
+#   TK_INSTRUMENT=stats.csv,overlay  append CSV rows and show an on-screen overlay
+#   TK_INSTRUMENT_INTERVAL=10        seconds between reports (default 5)
+# Every callback Tk can call (command=, bind, validation) goes through
+# Misc._register, variable traces through Variable._register and every timer
+# through Misc.after, so patching those three covers all handlers without
+# touching the apps. When the variable is unset install() returns at once and
+# nothing is patched.
+ENV_VAR = "TK_INSTRUMENT"
+DEFAULT_REPORT = "tk_instrument.json"
+REPORT_INTERVAL = 5.0
+# Reports cover the last WINDOW_SLOTS intervals; older samples drop out
+WINDOW_SLOTS = 12
+# A no-op timer this often measures how late the loop runs timers (loop lag)
+HEARTBEAT_MS = 50
+OVERLAY_MS = 1000
+OVERLAY_ROWS = 8
+# Handlers beyond this many distinct names share one entry, keeping memory fixed
+MAX_HANDLERS = 256
+OTHER = "<other>"
+LOOP = "<loop>"
+
+CSV_FIELDS = ("time", "kind", "name", "count", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "p99.9_ms", "max_ms")
+
+
+class RollingHistogram:
+    # One LatencyHistogram per interval in a ring; rotate() starts a new interval
+    def __init__(self, slots=WINDOW_SLOTS):
+        self.slots = [LatencyHistogram() for _ in range(slots)]
+        self.current = self.slots[0]
+        self.index = 0
+
+    def add(self, seconds):
+        self.current.add(seconds)
+
+    def rotate(self):
+        self.index = (self.index + 1) % len(self.slots)
+        self.current = self.slots[self.index]
+        self.current.clear()
+
+    def merged(self):
+        total = LatencyHistogram()
+        for slot in self.slots:
+            total.merge(slot)
+        return total
+
+
+class LoopStats:
+    def __init__(self, slots=WINDOW_SLOTS):
+        self.slots = slots
+        self.durations = {}  # handler name -> RollingHistogram of run time
+        self.lags = {}  # timer name -> RollingHistogram of how late it fired
+        self.started = time.time()
+
+    def _histogram(self, table, name):
+        histogram = table.get(name)
+        if histogram is None:
+            if len(table) >= MAX_HANDLERS:
+                name = OTHER
+            histogram = table.get(name)
+            if histogram is None:
+                histogram = table[name] = RollingHistogram(self.slots)
+        return histogram
+
+    def duration(self, name, seconds):
+        self._histogram(self.durations, name).add(seconds)
+
+    def lag(self, name, seconds):
+        self._histogram(self.lags, name).add(max(seconds, 0.0))
+
+    def rotate(self):
+        for table in (self.durations, self.lags):
+            for histogram in table.values():
+                histogram.rotate()
+
+    def report(self):
+        loop = self.lags.get(LOOP)
+        return {
+            "time": time.time(),
+            "uptime_s": time.time() - self.started,
+            "loop_lag": (loop.merged() if loop else LatencyHistogram()).summary(),
+            "handlers": {name: h.merged().summary() for name, h in sorted(self.durations.items())},
+            "timer_lag": {name: h.merged().summary() for name, h in sorted(self.lags.items()) if name != LOOP},
+        }
+
+
+stats = None
+_outputs = ()
+_interval = REPORT_INTERVAL
+_original_register = tkinter.Misc._register
+_original_variable_register = tkinter.Variable._register
+_original_after = tkinter.Misc.after
+_original_tk_init = tkinter.Tk.__init__
+
+
+def handler_name(func):
+    # "TicTacToe.ai_move"; lambdas also get their line so they can be told apart
+    inner = getattr(func, "func", func)  # functools.partial
+    name = getattr(inner, "__qualname__", None) or getattr(inner, "__name__", None) or repr(inner)
+    code = getattr(inner, "__code__", None)
+    if name.endswith("<lambda>") and code is not None:
+        name += f":{code.co_firstlineno}"
+    return name
+
+
+def _internal(func):
+    # Marks the instrument's own jobs so they are not measured
+    func._tk_instrument = True
+    return func
+
+
+def _timed(func, name):
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats.duration(name, time.perf_counter() - start)
+    timed._tk_instrument = True
+    return timed
+
+
+def _register(self, func, subst=None, needcleanup=1):
+    # after() wraps its callback in a local callit; that one is timed in _after instead
+    if not getattr(func, "_tk_instrument", False) and \
+            not getattr(func, "__qualname__", "").startswith("Misc.after."):
+        func = _timed(func, handler_name(func))
+    return _original_register(self, func, subst, needcleanup)
+
+
+def _variable_register(self, callback):
+    # trace_add() callbacks, e.g. a search box filtering as the user types
+    return _original_variable_register(self, _timed(callback, handler_name(callback)))
+
+
+def _after(self, ms, func=None, *args):
+    if func is None or getattr(func, "_tk_instrument", False):
+        return _original_after(self, ms, func, *args)
+    name = handler_name(func)
+    timed = _timed(func, name)
+    if ms == "idle":
+        return _original_after(self, ms, timed, *args)
+    due = time.perf_counter() + ms / 1000
+
+    def job(*job_args):
+        stats.lag(name, time.perf_counter() - due)
+        return timed(*job_args)
+    job._tk_instrument = True
+    return _original_after(self, ms, job, *args)
+
+
+def _tk_init(self, *args, **kwargs):
+    _original_tk_init(self, *args, **kwargs)
+    _start(self)
+
+
+def _start(root):
+    # Heartbeat, periodic reports and the overlay, all per Tk instance
+    @_internal
+    def heartbeat():
+        due = time.perf_counter() + HEARTBEAT_MS / 1000
+
+        @_internal
+        def beat():
+            stats.lag(LOOP, time.perf_counter() - due)
+            heartbeat()
+        try:
+            root.after(HEARTBEAT_MS, beat)
+        except tkinter.TclError:  # window destroyed
+            pass
+
+    @_internal
+    def tick():
+        write_report()
+        stats.rotate()
+        try:
+            root.after(int(_interval * 1000), tick)
+        except tkinter.TclError:
+            pass
+
+    heartbeat()
+    root.after(int(_interval * 1000), tick)
+    if "overlay" in _outputs and getattr(root, "_tkloaded", False):
+        _start_overlay(root)
+
+
+def _start_overlay(root):
+    window = tkinter.Toplevel(root)
+    window.title("Tk timings")
+    window.attributes("-topmost", True)
+    label = tkinter.Label(window, justify="left", anchor="nw", font=("Courier", 9), padx=6, pady=6)
+    label.pack(fill="both", expand=True)
+
+    @_internal
+    def refresh():
+        try:
+            label.config(text=format_report(stats.report()))
+            root.after(OVERLAY_MS, refresh)
+        except tkinter.TclError:
+            pass
+    refresh()
+
+
+def format_report(report, rows=OVERLAY_ROWS):
+    loop = report["loop_lag"]
+    lines = [f"loop lag  p50 {loop['p50_ms']:7.1f}  p99 {loop['p99_ms']:7.1f}  max {loop['max_ms']:7.1f} ms", "",
+             f"{'handler':32s} {'n':>6s} {'p50':>7s} {'p99':>7s} {'max':>7s}"]
+    slowest = sorted(report["handlers"].items(), key=lambda item: item[1]["p99_ms"], reverse=True)
+    for name, s in slowest[:rows]:
+        lines.append(f"{name[-32:]:32s} {s['count']:6d} {s['p50_ms']:7.1f} {s['p99_ms']:7.1f} {s['max_ms']:7.1f}")
+    for name, s in list(report["timer_lag"].items())[:rows]:
+        lines.append(f"late {name[-27:]:27s} {s['count']:6d} {s['p50_ms']:7.1f} {s['p99_ms']:7.1f} {s['max_ms']:7.1f}")
+    return "\n".join(lines)
+
+
+def write_report():
+    if stats is None:
+        return
+    report = stats.report()
+    for path in _outputs:
+        if path == "overlay":
+            continue
+        try:
+            if path.endswith(".csv"):
+                _append_csv(path, report)
+            else:
+                tmp = path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(report, f, indent=2)
+                os.replace(tmp, path)
+        except OSError as e:
+            print(f"tk_instrument: cannot write {path}: {e}", file=sys.stderr)
+
+
+def _append_csv(path, report):
+    new = not os.path.exists(path)
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        if new:
+            writer.writerow(CSV_FIELDS)
+        sections = [("loop", {LOOP: report["loop_lag"]}), ("handler", report["handlers"]),
+                    ("timer_lag", report["timer_lag"])]
+        for kind, entries in sections:
+            for name, s in entries.items():
+                writer.writerow([f"{report['time']:.3f}", kind, name] + [s[field] for field in CSV_FIELDS[3:]])
+
+
+def install(spec=None, interval=None):
+    # Turns instrumentation on if TK_INSTRUMENT (or spec) asks for it; call
+    # before the first Tk() is created. Returns whether it is active.
+    global stats, _outputs, _interval
+    if spec is None:
+        spec = os.environ.get(ENV_VAR, "")
+    if not spec or spec == "0" or stats is not None:
+        return stats is not None
+    if interval is None:
+        interval = float(os.environ.get(ENV_VAR + "_INTERVAL", REPORT_INTERVAL))
+    outputs = [part.strip() for part in spec.split(",") if part.strip()]
+    _outputs = tuple(DEFAULT_REPORT if part == "1" else part for part in outputs)
+    _interval = interval
+    stats = LoopStats()
+    tkinter.Misc._register = tkinter.Misc.register = _register
+    tkinter.Variable._register = _variable_register
+    tkinter.Misc.after = _after
+    tkinter.Tk.__init__ = _tk_init
+    atexit.register(write_report)
+    return True